@@ -0,0 +1,118 @@
+import os
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from MapEngine import app_cache_dir, default_jobs, default_map_projects_dir, default_maps_dir, export_project, is_valid_map_project, project_fingerprint, report, timestamp
+
+def default_state_path():
+    return os.path.join(app_cache_dir(), "batch_state.json")
+
+def list_map_projects(map_projects_dir=None):
+    """Return the folders under MapProjects that are valid map projects, sorted by name."""
+    map_projects_dir = map_projects_dir or default_map_projects_dir()
+    folders = sorted(entry.path for entry in os.scandir(map_projects_dir) if entry.is_dir())
+    return [folder for folder in folders if is_valid_map_project(folder)]
+
+def batch_output_path(folder_path, output_dir):
+    return os.path.join(output_dir, os.path.basename(os.path.normpath(folder_path)) + ".gbmap")
+
+def load_state(state_path):
+    try:
+        with open(state_path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+def save_state(state, state_path):
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+    temp_path = f"{state_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump(state, file)
+    os.replace(temp_path, state_path)
+
+def is_up_to_date(state, output_file_path, fingerprint):
+    entry = state.get(os.path.abspath(output_file_path))
+    if not entry or entry['fingerprint'] != fingerprint:
+        return False
+    try:
+        stat = os.stat(output_file_path)
+    except OSError:
+        return False
+    return entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns
+
+def export_one(folder_path, output_file_path, use_cache=True, cache_dir=None, cache_size=None):
+    """Worker entry point: export one project and return the time it took."""
+    start = time.perf_counter()
+    cache = None
+    if use_cache:
+        from TextureCache import TextureCache, DEFAULT_MAX_BYTES
+        cache = TextureCache(cache_dir, cache_size or DEFAULT_MAX_BYTES)
+    try:
+        # Projects are already spread over processes, so ingest textures serially
+        export_project(folder_path, output_file_path, jobs=1, cache=cache, incremental=True)
+    finally:
+        if cache is not None:
+            cache.close()
+    return time.perf_counter() - start
+
+def batch_export(map_projects_dir=None, output_dir=None, jobs=None, force=False, progress=None, use_cache=True, cache_dir=None, cache_size=None, state_path=None, cancelled=None):
+    """Export every valid project under map_projects_dir on a process pool.
+
+    Projects whose inputs are unchanged since their last successful export
+    (by path, size and mtime, see project_fingerprint()) are skipped unless
+    force is set. Returns one result dict per project with its 'project',
+    'output', 'status' ('exported', 'skipped', 'failed' or 'cancelled'),
+    'seconds' and 'error'.
+    """
+    output_dir = output_dir or default_maps_dir()
+    state_path = state_path or default_state_path()
+    jobs = jobs or default_jobs()
+    state = load_state(state_path)
+    os.makedirs(output_dir, exist_ok=True)
+
+    projects = list_map_projects(map_projects_dir)
+    report(progress, 'basic', f"Found {len(projects)} map projects")
+    results = []
+    pending = {}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for folder_path in projects:
+            output_file_path = batch_output_path(folder_path, output_dir)
+            result = {'project': folder_path, 'output': output_file_path, 'status': None, 'seconds': 0.0, 'error': None}
+            results.append(result)
+            try:
+                fingerprint = project_fingerprint(folder_path)
+            except Exception as e:
+                result.update(status='failed', error=str(e))
+                continue
+            if not force and is_up_to_date(state, output_file_path, fingerprint):
+                result['status'] = 'skipped'
+                continue
+            future = pool.submit(export_one, folder_path, output_file_path, use_cache, cache_dir, cache_size)
+            pending[future] = (result, fingerprint)
+
+        for idx, future in enumerate(as_completed(pending)):
+            result, fingerprint = pending[future]
+            name = os.path.basename(result['project'])
+            if cancelled is not None and cancelled():
+                for other in pending:
+                    other.cancel()
+            if future.cancelled():
+                result['status'] = 'cancelled'
+                continue
+            try:
+                result['seconds'] = future.result()
+                result['status'] = 'exported'
+                stat = os.stat(result['output'])
+                state[os.path.abspath(result['output'])] = {'fingerprint': fingerprint, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+                report(progress, 'basic', f"[{idx + 1}/{len(pending)}] {name}: exported in {result['seconds']:.2f}s")
+            except Exception as e:
+                result.update(status='failed', error=str(e))
+                report(progress, 'basic', f"[{idx + 1}/{len(pending)}] {name}: failed: {e}")
+            report(progress, 'progress', int((idx + 1) / len(pending) * 100))
+    save_state(state, state_path)
+
+    counts = {status: sum(1 for result in results if result['status'] == status) for status in ('exported', 'skipped', 'failed', 'cancelled')}
+    report(progress, 'basic', f"Batch export finished: {counts['exported']} exported, {counts['skipped']} unchanged, {counts['failed']} failed, {counts['cancelled']} cancelled")
+    report(progress, 'advanced', f"{timestamp()} Batch export total export time: {sum(result['seconds'] for result in results):.2f}s")
+    return results
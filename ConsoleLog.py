@@ -0,0 +1,73 @@
+import os
+import shutil
+import threading
+from collections import deque
+
+LEVELS = {'debug': 10, 'info': 20, 'warning': 30, 'error': 40}
+DEFAULT_CAPACITY = 5000
+
+class ConsoleLog:
+    """Thread-safe ring buffer of console lines, with an optional log file.
+
+    Lines at view_level or above are kept, at most capacity of them, and
+    queued for a view to drain() in batches; everything at file_level or
+    above also goes to file_path, so per-record detail can be logged to the
+    file without ever reaching the view.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, file_path=None, view_level='info', file_level='debug'):
+        self.lines = deque(maxlen=capacity)
+        self.pending = deque(maxlen=capacity)
+        self.view_level = LEVELS[view_level]
+        self.file_level = LEVELS[file_level]
+        self.file_path = file_path
+        self.file = None
+        self.lock = threading.Lock()
+        self.open_file()
+
+    def open_file(self):
+        if self.file_path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.file_path)), exist_ok=True)
+            self.file = open(self.file_path, 'w', encoding='utf-8')
+
+    def log(self, message, level='info'):
+        level = LEVELS[level]
+        with self.lock:
+            if self.file is not None and level >= self.file_level:
+                self.file.write(message + "\n")
+            if level >= self.view_level:
+                self.lines.append(message)
+                self.pending.append(message)
+
+    def drain(self):
+        """Return and forget the lines logged since the last drain()."""
+        with self.lock:
+            lines = list(self.pending)
+            self.pending.clear()
+        return lines
+
+    def clear(self):
+        """Start over: empty the buffer and truncate the log file."""
+        with self.lock:
+            self.lines.clear()
+            self.pending.clear()
+            if self.file is not None:
+                self.file.close()
+                self.open_file()
+
+    def save(self, file_path):
+        """Write the full log (the log file if there is one, else the buffer) to file_path."""
+        with self.lock:
+            if self.file is not None:
+                self.file.flush()
+                shutil.copyfile(self.file_path, file_path)
+                return
+            lines = list(self.lines)
+        with open(file_path, 'w', encoding='utf-8') as file:
+            file.writelines(line + "\n" for line in lines)
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
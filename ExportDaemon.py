@@ -0,0 +1,361 @@
+import os
+import json
+import time
+import hmac
+import heapq
+import secrets
+import itertools
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from MapEngine import ExportCancelled, app_cache_dir, default_jobs, default_maps_dir, export_project, timestamp
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 2
+MAX_FINISHED_JOBS = 1000
+TOKEN_HEADER = 'X-Export-Token'
+
+def default_token_path():
+    return os.path.join(app_cache_dir(), "daemon_token")
+
+def create_token(token_path=None):
+    """Write a fresh random token readable only by this user and return it."""
+    token_path = token_path or default_token_path()
+    os.makedirs(os.path.dirname(token_path), exist_ok=True)
+    token = secrets.token_hex(32)
+    if os.path.exists(token_path):
+        os.remove(token_path)
+    with os.fdopen(os.open(token_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), 'w', encoding='utf-8') as file:
+        file.write(token)
+    return token
+
+def read_token(token_path=None):
+    try:
+        with open(token_path or default_token_path(), 'r', encoding='utf-8') as file:
+            return file.read().strip()
+    except OSError:
+        return None
+
+class ExportDaemon:
+    """A queue of export jobs run by a bounded pool of worker threads.
+
+    Jobs run highest priority first, then in submission order. Submitting a
+    job identical (same folder, output, name and description) to one still
+    queued returns the queued job instead, raising its priority if needed.
+    Two jobs never write the same output at once. The texture cache, the
+    process pool that encodes textures and every imported module stay warm
+    between jobs.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, jobs=None, use_cache=True, cache_dir=None, cache_size=None):
+        self.workers = workers
+        self.jobs = jobs or default_jobs()
+        self.cache = None
+        if use_cache:
+            from TextureCache import TextureCache, DEFAULT_MAX_BYTES
+            self.cache = TextureCache(cache_dir, cache_size or DEFAULT_MAX_BYTES)
+        self.encode_pool = None
+        if self.jobs > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            self.encode_pool = ProcessPoolExecutor(max_workers=self.jobs)
+        self.condition = threading.Condition()
+        self.queue = []
+        self.queued = {}
+        self.jobs_by_id = {}
+        self.running_outputs = set()
+        self.ids = itertools.count(1)
+        self.sequence = itertools.count()
+        self.stopping = False
+        self.threads = [threading.Thread(target=self.work, name=f"export-worker-{idx}", daemon=True) for idx in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, folder_path, output_file_path=None, map_name=None, map_description=None, priority=0):
+        """Queue an export and return (job, deduplicated)."""
+        folder_path = os.path.abspath(folder_path)
+        output_file_path = os.path.abspath(output_file_path or os.path.join(default_maps_dir(), os.path.basename(folder_path) + ".gbmap"))
+        if not output_file_path.lower().endswith(".gbmap"):
+            raise RuntimeError(f"Output must be a .gbmap file: {output_file_path}")
+        dedup_key = (folder_path, output_file_path, map_name, map_description)
+        with self.condition:
+            if self.stopping:
+                raise RuntimeError("The daemon is shutting down")
+            job = self.queued.get(dedup_key)
+            if job is not None:
+                job['requests'] += 1
+                if priority > job['priority']:
+                    job['priority'] = priority
+                    heapq.heappush(self.queue, (-priority, next(self.sequence), job['id']))
+                return job, True
+            job = {
+                'id': next(self.ids),
+                'folder': folder_path,
+                'output': output_file_path,
+                'name': map_name,
+                'description': map_description,
+                'priority': priority,
+                'status': 'queued',
+                'error': None,
+                'requests': 1,
+                'queued_at': time.time(),
+                'wait_seconds': None,
+                'run_seconds': None,
+                'stages': None,
+                'messages': [],
+            }
+            self.jobs_by_id[job['id']] = job
+            self.queued[dedup_key] = job
+            heapq.heappush(self.queue, (-priority, next(self.sequence), job['id']))
+            self.condition.notify()
+            return job, False
+
+    def cancel(self, job_id):
+        """Cancel a queued job or stop a running one; returns the job or None."""
+        with self.condition:
+            job = self.jobs_by_id.get(job_id)
+            if job is None:
+                return None
+            if job['status'] == 'queued':
+                job['status'] = 'cancelled'
+                self.queued.pop(self.dedup_key(job), None)
+            elif job['status'] == 'running':
+                job['cancel_requested'] = True
+            return job
+
+    def dedup_key(self, job):
+        return (job['folder'], job['output'], job['name'], job['description'])
+
+    def next_job(self):
+        """Pop the best queued job whose output is not being written; call with the condition held."""
+        skipped = []
+        job = None
+        while self.queue:
+            entry = heapq.heappop(self.queue)
+            candidate = self.jobs_by_id.get(entry[2])
+            # Stale heap entries: forgotten or cancelled jobs and superseded priorities
+            if candidate is None or candidate['status'] != 'queued' or -entry[0] != candidate['priority']:
+                continue
+            if candidate['output'] in self.running_outputs:
+                skipped.append(entry)
+                continue
+            job = candidate
+            break
+        for entry in skipped:
+            heapq.heappush(self.queue, entry)
+        return job
+
+    def work(self):
+        while True:
+            with self.condition:
+                job = self.next_job()
+                while job is None and not self.stopping:
+                    self.condition.wait()
+                    job = self.next_job()
+                if job is None:
+                    return
+                self.queued.pop(self.dedup_key(job), None)
+                self.running_outputs.add(job['output'])
+                job['status'] = 'running'
+                job['wait_seconds'] = time.time() - job['queued_at']
+            self.run_job(job)
+            with self.condition:
+                self.running_outputs.discard(job['output'])
+                self.forget_old_jobs()
+                idle = not self.running_outputs and not self.queued
+                self.condition.notify_all()
+            if idle and self.cache is not None:
+                # Persist the cache index and enforce the size cap between bursts of work
+                self.cache.close()
+
+    def run_job(self, job):
+        from ExportTrace import ExportTrace
+
+        def progress(kind, value):
+            if kind == 'advanced':
+                job['messages'].append(value)
+
+        start = time.perf_counter()
+        trace = ExportTrace()
+        try:
+            export_project(job['folder'], job['output'], job['name'], job['description'], progress, jobs=self.jobs, cache=self.cache, incremental=True, cancelled=lambda: job.get('cancel_requested', False), trace=trace, encode_pool=self.encode_pool)
+            job['status'] = 'done'
+        except ExportCancelled:
+            job['status'] = 'cancelled'
+        except Exception as e:
+            job['status'] = 'failed'
+            job['error'] = str(e)
+        job['run_seconds'] = time.perf_counter() - start
+        job['stages'] = trace.stages
+        job['messages'] = job['messages'][-50:]
+
+    def forget_old_jobs(self):
+        finished = [job_id for job_id, job in self.jobs_by_id.items() if job['status'] in ('done', 'failed', 'cancelled')]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs_by_id[job_id]
+
+    def job_list(self):
+        with self.condition:
+            return [dict(job, messages=len(job['messages'])) for job in self.jobs_by_id.values()]
+
+    def job(self, job_id):
+        with self.condition:
+            job = self.jobs_by_id.get(job_id)
+            return dict(job, messages=list(job['messages'])) if job is not None else None
+
+    def stats(self):
+        with self.condition:
+            statuses = [job['status'] for job in self.jobs_by_id.values()]
+            finished = [job for job in self.jobs_by_id.values() if job['run_seconds'] is not None]
+        hits = self.cache.hits if self.cache is not None else 0
+        misses = self.cache.misses if self.cache is not None else 0
+        return {
+            'workers': self.workers,
+            'jobs_per_export': self.jobs,
+            'statuses': {status: statuses.count(status) for status in ('queued', 'running', 'done', 'failed', 'cancelled')},
+            'cache_hits': hits,
+            'cache_misses': misses,
+            'cache_hit_rate': hits / (hits + misses) if hits + misses else None,
+            'average_wait_seconds': sum(job['wait_seconds'] for job in finished) / len(finished) if finished else None,
+            'average_run_seconds': sum(job['run_seconds'] for job in finished) / len(finished) if finished else None,
+        }
+
+    def shutdown(self):
+        """Stop taking jobs, let running ones finish and release the pool and cache."""
+        with self.condition:
+            self.stopping = True
+            for job in self.queued.values():
+                job['status'] = 'cancelled'
+            self.queued.clear()
+            self.condition.notify_all()
+        for thread in self.threads:
+            thread.join()
+        if self.encode_pool is not None:
+            self.encode_pool.shutdown(wait=True, cancel_futures=True)
+        if self.cache is not None:
+            self.cache.close()
+
+class DaemonRequestHandler(BaseHTTPRequestHandler):
+    """JSON over HTTP: POST /jobs, GET /jobs, GET /jobs/ID, DELETE /jobs/ID, GET /stats, POST /shutdown.
+
+    Every request must carry the token from the daemon's token file, and is
+    refused if it comes from a web page: it has an Origin header, or it is a
+    POST whose Content-Type is not application/json. A browser cannot send
+    such a POST cross-origin without a preflight, which is never answered.
+    """
+
+    def send_json(self, status, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def authorized(self):
+        if self.headers.get('Origin') is not None:
+            self.send_json(403, {'error': 'cross-origin requests are not accepted'})
+            return False
+        if self.command == 'POST' and self.headers.get('Content-Type', '').split(';')[0].strip().lower() != 'application/json':
+            self.send_json(415, {'error': 'Content-Type must be application/json'})
+            return False
+        if not hmac.compare_digest(self.headers.get(TOKEN_HEADER, '').encode('utf-8'), self.server.token.encode('utf-8')):
+            self.send_json(403, {'error': 'missing or wrong daemon token'})
+            return False
+        return True
+
+    def job_id(self):
+        try:
+            return int(self.path.rstrip('/').rsplit('/', 1)[1])
+        except ValueError:
+            return None
+
+    def do_GET(self):
+        if not self.authorized():
+            return
+        daemon = self.server.export_daemon
+        if self.path.rstrip('/') == '/jobs':
+            self.send_json(200, daemon.job_list())
+        elif self.path.startswith('/jobs/'):
+            job = daemon.job(self.job_id())
+            self.send_json(200 if job else 404, job or {'error': 'no such job'})
+        elif self.path.rstrip('/') == '/stats':
+            self.send_json(200, daemon.stats())
+        else:
+            self.send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if not self.authorized():
+            return
+        daemon = self.server.export_daemon
+        if self.path.rstrip('/') == '/jobs':
+            try:
+                request = self.read_json()
+                job, deduplicated = daemon.submit(request['folder'], request.get('output'), request.get('name'), request.get('description'), int(request.get('priority', 0)))
+            except (KeyError, ValueError, RuntimeError) as e:
+                self.send_json(400, {'error': str(e)})
+                return
+            self.send_json(200, {'id': job['id'], 'deduplicated': deduplicated})
+        elif self.path.rstrip('/') == '/shutdown':
+            self.send_json(200, {'status': 'shutting down'})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        else:
+            self.send_json(404, {'error': 'not found'})
+
+    def do_DELETE(self):
+        if not self.authorized():
+            return
+        if not self.path.startswith('/jobs/'):
+            self.send_json(404, {'error': 'not found'})
+            return
+        job = self.server.export_daemon.cancel(self.job_id())
+        self.send_json(200 if job else 404, {'id': job['id'], 'status': job['status']} if job else {'error': 'no such job'})
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=DEFAULT_WORKERS, jobs=None, use_cache=True, cache_dir=None, cache_size=None, verbose=False):
+    """Run the daemon's HTTP API until POST /shutdown or Ctrl+C."""
+    daemon = ExportDaemon(workers, jobs, use_cache, cache_dir, cache_size)
+    server = ThreadingHTTPServer((host, port), DaemonRequestHandler)
+    server.export_daemon = daemon
+    server.verbose = verbose
+    server.token = create_token()
+    print(f"{timestamp()} Export daemon listening on http://{host}:{server.server_address[1]} with {workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        daemon.shutdown()
+        print(f"{timestamp()} Export daemon stopped")
+
+def call(method, path, data=None, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=30):
+    """Client side: send a request to a running daemon and return the decoded JSON reply."""
+    token = read_token()
+    if token is None:
+        raise RuntimeError(f"No export daemon token at {default_token_path()}; start the daemon first")
+    body = json.dumps(data if data is not None else {}).encode('utf-8') if method == 'POST' else None
+    request = urllib.request.Request(f"http://{host}:{port}{path}", data=body, method=method, headers={'Content-Type': 'application/json', TOKEN_HEADER: token})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        raise RuntimeError(json.loads(e.read() or b'{}').get('error', str(e)))
+    except urllib.error.URLError as e:
+        raise RuntimeError(f"No export daemon at {host}:{port} ({e.reason})")
+
+def wait_for_job(job_id, host=DEFAULT_HOST, port=DEFAULT_PORT, poll_interval=0.2):
+    while True:
+        job = call('GET', f"/jobs/{job_id}", host=host, port=port)
+        if job['status'] not in ('queued', 'running'):
+            return job
+        time.sleep(poll_interval)
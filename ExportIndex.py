@@ -0,0 +1,79 @@
+import os
+import json
+import hashlib
+
+from MapEngine import NEWLINE, app_cache_dir
+
+INDEX_VERSION = 2
+
+def default_index_dir():
+    return os.path.join(app_cache_dir(), "exports")
+
+def index_path_for(output_file_path, index_dir=None):
+    name = hashlib.sha1(os.path.abspath(output_file_path).encode('utf-8')).hexdigest()
+    return os.path.join(index_dir or default_index_dir(), name + ".json")
+
+def input_signature(kind, file_path, *extra, root=None, stat=None):
+    """Describe an input by path, size and mtime; a record is reusable while this is unchanged.
+
+    Paths below root are stored relative to it, others absolute. stat may be
+    passed in when the caller already has it.
+    """
+    if stat is None:
+        stat = os.stat(file_path)
+    if root is not None and file_path.startswith(root):
+        file_path = file_path[len(root):]
+    else:
+        file_path = os.path.abspath(file_path)
+    return (kind, file_path, stat.st_size, stat.st_mtime_ns, *extra)
+
+class ExportIndex:
+    """Byte ranges of the records in a written .gbmap, keyed by input signature.
+
+    The index is only trusted while the .gbmap it describes still has the size
+    and mtime recorded when it was saved; otherwise load() returns None and the
+    caller falls back to a full export.
+    """
+
+    def __init__(self, output_file_path, index_dir=None):
+        self.output_file_path = output_file_path
+        self.index_path = index_path_for(output_file_path, index_dir)
+        self.records = {}
+
+    @classmethod
+    def load(cls, output_file_path, index_dir=None):
+        index = cls(output_file_path, index_dir)
+        try:
+            with open(index.index_path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+            stat = os.stat(output_file_path)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != INDEX_VERSION or data.get('newline') != NEWLINE.decode('ascii'):
+            return None
+        if data.get('size') != stat.st_size or data.get('mtime_ns') != stat.st_mtime_ns:
+            return None
+        index.records = {tuple(signature): tuple(span) for signature, span in data['records']}
+        return index
+
+    def find(self, signature):
+        return self.records.get(signature)
+
+    def add(self, signature, offset, length):
+        self.records[signature] = (offset, length)
+
+    def save(self):
+        stat = os.stat(self.output_file_path)
+        data = {
+            'version': INDEX_VERSION,
+            'newline': NEWLINE.decode('ascii'),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'records': [[list(signature), list(span)] for signature, span in self.records.items()],
+        }
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        temp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            # json.dump() encodes in pure Python; dumps() uses the C encoder
+            file.write(json.dumps(data))
+        os.replace(temp_path, self.index_path)
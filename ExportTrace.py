@@ -0,0 +1,113 @@
+import os
+import json
+import time
+from contextlib import contextmanager
+
+from MapEngine import app_cache_dir
+
+def default_trace_path():
+    return os.path.join(app_cache_dir(), "last_export_trace.jsonl")
+
+class ExportTrace:
+    """Monotonic timings, byte counts and item counts of one export.
+
+    Every stage and record is written to trace_path as one JSON object per
+    line (if given) and totalled per stage for summary_lines(). Times come
+    from time.perf_counter() and are relative to when the trace was created.
+    Record events carry the stage, item name, seconds, bytes_in (input file
+    size) and bytes_out (bytes written), plus extra fields such as how a
+    texture record was produced.
+    """
+
+    def __init__(self, trace_path=None):
+        self.trace_path = trace_path
+        self.file = None
+        if trace_path:
+            os.makedirs(os.path.dirname(os.path.abspath(trace_path)), exist_ok=True)
+            self.file = open(trace_path, 'w', encoding='utf-8')
+        self.start = time.perf_counter()
+        self.stages = {}
+        self.write({'event': 'start', 'time': time.time()})
+
+    def close(self):
+        if self.file is not None:
+            self.write({'event': 'end', 'seconds': self.elapsed(), 'stages': self.stages})
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def write(self, event):
+        if self.file is not None:
+            self.file.write(json.dumps(event) + "\n")
+
+    def totals(self, stage):
+        return self.stages.setdefault(stage, {'seconds': 0.0, 'records': 0, 'bytes_in': 0, 'bytes_out': 0})
+
+    @contextmanager
+    def stage(self, name):
+        """Time a stage; records written inside it only add to its counts, not its time."""
+        start = time.perf_counter()
+        self.write({'event': 'stage_start', 'stage': name, 'at': start - self.start})
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self.totals(name)['seconds'] += seconds
+            self.write({'event': 'stage_end', 'stage': name, 'at': self.elapsed(), 'seconds': seconds})
+
+    def record(self, stage, name, seconds, bytes_in=0, bytes_out=0, **extra):
+        totals = self.totals(stage)
+        totals['records'] += 1
+        totals['bytes_in'] += bytes_in
+        totals['bytes_out'] += bytes_out
+        self.write({'event': 'record', 'stage': stage, 'name': name, 'seconds': seconds, 'bytes_in': bytes_in, 'bytes_out': bytes_out, **extra})
+
+    def summary_lines(self):
+        lines = [f"Export took {self.elapsed():.3f}s" + (f", trace written to {self.trace_path}" if self.trace_path else "")]
+        for stage, totals in self.stages.items():
+            rate = f", {totals['bytes_out'] / 1e6 / totals['seconds']:.1f} MB/s out" if totals['seconds'] > 0 and totals['bytes_out'] else ""
+            counts = f", {totals['records']} records, {totals['bytes_in']} bytes in, {totals['bytes_out']} bytes out" if totals['records'] else ""
+            lines.append(f"  {stage}: {totals['seconds']:.3f}s{counts}{rate}")
+        return lines
+
+@contextmanager
+def profiled(profile_path=None, trace_memory=False, top=15):
+    """Run the body under cProfile and/or tracemalloc, for a single export.
+
+    cProfile stats are dumped to profile_path (open with pstats or snakeviz);
+    only the calling thread is profiled, so use jobs=1 to see texture work.
+    Yields a list that receives summary lines once the body finishes.
+    """
+    summary = []
+    profiler = None
+    if profile_path:
+        import cProfile
+        profiler = cProfile.Profile()
+    if trace_memory:
+        import tracemalloc
+        tracemalloc.start()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield summary
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+            summary.append(f"Profile written to {profile_path}")
+        if trace_memory:
+            # Leave out the profiler's own bookkeeping when both are on
+            snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, "*/cProfile.py"), tracemalloc.Filter(False, tracemalloc.__file__)])
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            summary.append(f"Python allocations: {current / 1e6:.1f} MB live, {peak / 1e6:.1f} MB peak")
+            for stat in snapshot.statistics('lineno')[:top]:
+                summary.append(f"  {stat}")
@@ -0,0 +1,430 @@
+import os
+import sys
+import json
+import zlib
+import random
+import struct
+import argparse
+import tempfile
+import subprocess
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def make_png(width, height, seed=0):
+    """Return a valid RGB PNG of random pixels, without needing PIL."""
+    rng = random.Random(seed)
+    row_size = width * 3
+    raw = b''.join(b'\x00' + rng.randbytes(row_size) for _ in range(height))
+
+    def chunk(chunk_type, data):
+        return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data) & 0xffffffff)
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) + chunk(b'IDAT', zlib.compress(raw, 1)) + chunk(b'IEND', b'')
+
+def make_jpg(width, height, seed=0):
+    """Return a JPG of random pixels; unlike make_png() this needs PIL."""
+    import io
+    from PIL import Image
+    rng = random.Random(seed)
+    output = io.BytesIO()
+    Image.frombytes('RGB', (width, height), rng.randbytes(width * height * 3)).save(output, 'JPEG', quality=90)
+    return output.getvalue()
+
+def make_map_cube(lines, seed=0):
+    rng = random.Random(seed)
+    return ''.join(f"{rng.random():.6f},{rng.random():.6f},{rng.random():.6f}\n" for _ in range(lines))
+
+def generate_project(folder_path, cubes=100, cube_lines=200, textures=10, texture_size=256, icon_size=256, banner_size=(1024, 256), jpg_textures=0):
+    """Write a synthetic MapProjects folder of the given shape.
+
+    textures PNGs and jpg_textures JPGs (which need PIL) of texture_size
+    squared pixels are written to CustomTextures, and cubes map cubes of
+    cube_lines lines each to MapData.
+    """
+    os.makedirs(os.path.join(folder_path, "MapData"), exist_ok=True)
+    os.makedirs(os.path.join(folder_path, "CustomTextures"), exist_ok=True)
+    with open(os.path.join(folder_path, "projectFile.gbi"), 'w', encoding='utf-8') as file:
+        file.write("0\nBenchmark Map\nSynthetic benchmark project\n0\n")
+    with open(os.path.join(folder_path, "icon.png"), 'wb') as file:
+        file.write(make_png(icon_size, icon_size, 1))
+    with open(os.path.join(folder_path, "banner.png"), 'wb') as file:
+        file.write(make_png(banner_size[0], banner_size[1], 2))
+    for idx in range(textures):
+        with open(os.path.join(folder_path, "CustomTextures", f"texture{idx}.png"), 'wb') as file:
+            file.write(make_png(texture_size, texture_size, 100 + idx))
+    for idx in range(jpg_textures):
+        with open(os.path.join(folder_path, "CustomTextures", f"photo{idx}.jpg"), 'wb') as file:
+            file.write(make_jpg(texture_size, texture_size, 500 + idx))
+    for idx in range(cubes):
+        with open(os.path.join(folder_path, "MapData", f"cube{idx}.mapCube"), 'w', encoding='utf-8') as file:
+            file.write(make_map_cube(cube_lines, 1000 + idx))
+
+PEAK_RSS_CODE = """
+def peak_rss():
+    # Linux keeps ru_maxrss across exec, so prefer the per-process high water mark
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+"""
+
+def measure_peak_rss(folder_path, output_file_path, jobs=None):
+    """Export in a fresh interpreter and return its peak RSS in bytes (POSIX only).
+
+    jobs defaults to the CPU count, as for a real export; the RSS is that of
+    the writing process, not its encoding workers.
+    """
+    code = (
+        "import sys, MapEngine\n"
+        + PEAK_RSS_CODE +
+        "MapEngine.export_project(sys.argv[1], sys.argv[2], jobs=int(sys.argv[3]) or None)\n"
+        "print(peak_rss())\n"
+    )
+    result = subprocess.run([sys.executable, '-c', code, folder_path, output_file_path, str(jobs or 0)], cwd=HERE, capture_output=True, text=True, check=True)
+    return int(result.stdout.strip().splitlines()[-1])
+
+STAGES = ['read_project_file', 'convert_png_to_ints', 'read_custom_textures', 'read_map_cubes', 'create_gbmap_file']
+
+STAGE_CODE = """
+import sys, json, time, MapEngine
+""" + PEAK_RSS_CODE + """
+stage, folder_path, output_file_path, jobs = sys.argv[1], sys.argv[2], sys.argv[3], int(sys.argv[4])
+paths = MapEngine.project_paths(folder_path)
+start = time.perf_counter()
+if stage == 'read_project_file':
+    MapEngine.read_project_file(paths['project_file'])
+elif stage == 'convert_png_to_ints':
+    for png_path in [paths['icon'], paths['banner']] + [path for _, path in MapEngine.list_custom_textures(paths['custom_textures']) if path.endswith('.png')]:
+        MapEngine.convert_png_to_ints(png_path)
+elif stage == 'read_custom_textures':
+    MapEngine.read_custom_textures(paths['custom_textures'])
+elif stage == 'read_map_cubes':
+    MapEngine.read_map_cubes(paths['map_data'])
+elif stage == 'create_gbmap_file':
+    MapEngine.create_gbmap_file(output_file_path, paths['project_file'], paths['icon'], paths['banner'], MapEngine.list_custom_textures(paths['custom_textures']), MapEngine.list_map_cubes(paths['map_data']), jobs=jobs)
+seconds = time.perf_counter() - start
+print(json.dumps({'seconds': seconds, 'peak_rss': peak_rss()}))
+"""
+
+def stage_input_bytes(stage, folder_path):
+    """Return how many bytes of the project a stage reads, for MB/s."""
+    from MapEngine import project_paths, list_custom_textures, list_map_cubes
+    paths = project_paths(folder_path)
+    textures = [path for _, path in list_custom_textures(paths['custom_textures'])]
+    if stage == 'read_project_file':
+        files = [paths['project_file']]
+    elif stage == 'convert_png_to_ints':
+        files = [paths['icon'], paths['banner']] + [path for path in textures if path.endswith('.png')]
+    elif stage == 'read_custom_textures':
+        files = textures
+    elif stage == 'read_map_cubes':
+        files = list_map_cubes(paths['map_data'])
+    else:
+        files = [paths['project_file'], paths['icon'], paths['banner']] + textures + list_map_cubes(paths['map_data'])
+    return sum(os.path.getsize(path) for path in files)
+
+def run_stage(stage, folder_path, output_file_path, jobs=1):
+    """Run one stage in a fresh interpreter; returns {'seconds', 'peak_rss'}."""
+    result = subprocess.run([sys.executable, '-c', STAGE_CODE, stage, folder_path, output_file_path, str(jobs)], cwd=HERE, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Error running stage {stage}: {result.stderr.strip().splitlines()[-1] if result.stderr.strip() else result.returncode}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def benchmark_stages(folder_path, output_file_path, repeat=3, jobs=1, stages=STAGES):
+    """Time each stage repeat times and keep the fastest run and the highest peak RSS."""
+    results = {}
+    for stage in stages:
+        runs = [run_stage(stage, folder_path, output_file_path, jobs) for _ in range(repeat)]
+        seconds = min(run['seconds'] for run in runs)
+        input_bytes = stage_input_bytes(stage, folder_path)
+        results[stage] = {
+            'seconds': seconds,
+            'input_bytes': input_bytes,
+            'mb_per_s': input_bytes / 1e6 / seconds if seconds > 0 else 0.0,
+            'peak_rss': max(run['peak_rss'] for run in runs),
+            'output_bytes': os.path.getsize(output_file_path) if stage == 'create_gbmap_file' else None,
+        }
+    return results
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Return a list of regressions of results against a saved baseline."""
+    regressions = []
+    for stage, result in results.items():
+        base = baseline['stages'].get(stage)
+        if base is None:
+            continue
+        if result['seconds'] > base['seconds'] * (1 + tolerance):
+            regressions.append(f"{stage}: {result['seconds']:.3f}s vs baseline {base['seconds']:.3f}s")
+        if result['peak_rss'] > base['peak_rss'] * (1 + tolerance):
+            regressions.append(f"{stage}: peak RSS {result['peak_rss'] / 1e6:.1f} MB vs baseline {base['peak_rss'] / 1e6:.1f} MB")
+        if base.get('output_bytes') is not None and result['output_bytes'] != base['output_bytes']:
+            regressions.append(f"{stage}: output {result['output_bytes']} bytes vs baseline {base['output_bytes']} bytes")
+    return regressions
+
+STARTUP_MILESTONES = ['import', 'first_paint', 'projects_loaded']
+
+STARTUP_CODE = """
+import sys, json, time
+launched = float(sys.argv[1])
+""" + PEAK_RSS_CODE + """
+results = {}
+def milestone(name):
+    if name not in results:
+        results[name] = {'seconds': time.time() - launched, 'peak_rss': peak_rss()}
+        if len(results) == 3:
+            app.quit()
+
+from PyQt5.QtCore import QEvent, QObject
+from PyQt5.QtWidgets import QApplication
+import MapExporterGUI
+milestone('import')
+
+class FirstPaint(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            milestone('first_paint')
+        return False
+
+app = QApplication(sys.argv[:1])
+window = MapExporterGUI.MapCreatorApp()
+window.projects_loaded.connect(lambda: milestone('projects_loaded'))
+paint_filter = FirstPaint()
+window.installEventFilter(paint_filter)
+window.show()
+app.exec_()
+window.close()
+print(json.dumps(results))
+"""
+
+def run_startup(home_dir, cache_dir):
+    """Start the GUI in a fresh interpreter; returns {milestone: {'seconds', 'peak_rss'}} measured from launch."""
+    env = dict(os.environ, HOME=home_dir, USERPROFILE=home_dir, LOCALAPPDATA=cache_dir)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    launched = time.time()
+    result = subprocess.run([sys.executable, '-c', STARTUP_CODE, repr(launched)], cwd=HERE, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Error starting the GUI: {result.stderr.strip().splitlines()[-1] if result.stderr.strip() else result.returncode}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def benchmark_startup(home_dir, repeat=3, warm_cache=False):
+    """Time startup milestones repeat times, keeping the fastest time and highest peak RSS of each.
+
+    Every run gets an empty cache directory, so the project index starts
+    cold, unless warm_cache is set.
+    """
+    runs = []
+    with tempfile.TemporaryDirectory() as cache_root:
+        for idx in range(repeat):
+            cache_dir = os.path.join(cache_root, "shared" if warm_cache else f"run{idx}")
+            runs.append(run_startup(home_dir, cache_dir))
+    return {name: {'seconds': min(run[name]['seconds'] for run in runs), 'peak_rss': max(run[name]['peak_rss'] for run in runs)} for name in STARTUP_MILESTONES}
+
+def project_shape(args):
+    return {
+        'cubes': args.cubes,
+        'cube_lines': args.cube_lines,
+        'textures': args.textures,
+        'jpg_textures': args.jpg_textures,
+        'texture_size': args.texture_size,
+        'icon_size': args.icon_size,
+        'banner_size': args.banner_size,
+        'jobs': args.jobs,
+    }
+
+def generate_from_args(args, folder_path):
+    generate_project(folder_path, args.cubes, args.cube_lines, args.textures, args.texture_size, args.icon_size, tuple(args.banner_size), args.jpg_textures)
+
+def run_generate(args):
+    generate_from_args(args, args.folder)
+    print(f"Generated {args.folder}")
+    return 0
+
+def run_stages(args):
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        if baseline.get('shape') != project_shape(args):
+            print(f"Warning: baseline was recorded for a different project shape: {baseline.get('shape')}", file=sys.stderr)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        folder_path = os.path.join(temp_dir, "BenchmarkProject")
+        output_file_path = os.path.join(temp_dir, "Benchmark.gbmap")
+        generate_from_args(args, folder_path)
+        results = benchmark_stages(folder_path, output_file_path, args.repeat, args.jobs, args.stage or STAGES)
+
+    print(f"{'stage':<22}{'seconds':>10}{'MB in':>10}{'MB/s':>10}{'peak RSS MB':>13}{'output MB':>11}")
+    for stage, result in results.items():
+        output = f"{result['output_bytes'] / 1e6:.1f}" if result['output_bytes'] is not None else '-'
+        print(f"{stage:<22}{result['seconds']:>10.3f}{result['input_bytes'] / 1e6:>10.1f}{result['mb_per_s']:>10.1f}{result['peak_rss'] / 1e6:>13.1f}{output:>11}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as file:
+            json.dump({'shape': project_shape(args), 'stages': results}, file, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if baseline is not None:
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+def add_shape_arguments(parser, cubes, cube_lines, textures, texture_size):
+    parser.add_argument('--cubes', type=int, default=cubes)
+    parser.add_argument('--cube-lines', type=int, default=cube_lines)
+    parser.add_argument('--textures', type=int, default=textures, help='number of PNG textures')
+    parser.add_argument('--jpg-textures', type=int, default=0, help='number of JPG textures (needs PIL)')
+    parser.add_argument('--texture-size', type=int, default=texture_size)
+    parser.add_argument('--icon-size', type=int, default=256)
+    parser.add_argument('--banner-size', type=int, nargs=2, default=[1024, 256], metavar=('WIDTH', 'HEIGHT'))
+
+def run_memory(args):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        folder_path = os.path.join(temp_dir, "BenchmarkProject")
+        output_file_path = os.path.join(temp_dir, "Benchmark.gbmap")
+        generate_from_args(args, folder_path)
+        peak = measure_peak_rss(folder_path, output_file_path, args.jobs)
+        print(f"input {sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(folder_path) for name in names) / 1e6:.1f} MB, "
+              f"output {os.path.getsize(output_file_path) / 1e6:.1f} MB, peak RSS {peak / 1e6:.1f} MB")
+    return 0
+
+def run_startup_benchmark(args):
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        if baseline.get('shape') != {'projects': args.projects}:
+            print(f"Warning: baseline was recorded for a different project count: {baseline.get('shape')}", file=sys.stderr)
+
+    with tempfile.TemporaryDirectory() as home_dir:
+        map_projects_dir = os.path.join(home_dir, "AppData", "LocalLow", "F2Games", "GoreBox", "MapProjects")
+        for idx in range(args.projects):
+            generate_project(os.path.join(map_projects_dir, f"Project{idx}"), cubes=2, cube_lines=10, textures=2, texture_size=64, icon_size=128, banner_size=(256, 64))
+        results = benchmark_startup(home_dir, args.repeat, args.warm_cache)
+
+    print(f"{'milestone':<18}{'seconds':>10}{'peak RSS MB':>13}")
+    for name, result in results.items():
+        print(f"{name:<18}{result['seconds']:>10.3f}{result['peak_rss'] / 1e6:>13.1f}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as file:
+            json.dump({'shape': {'projects': args.projects}, 'stages': results}, file, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if baseline is not None:
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+def write_reference_gbmap(output_file_path, folder_path, map_name=None, map_description=None):
+    """Write a project the way the original single-pass exporter did, to byte-compare the engine against.
+
+    Textures and cubes are taken in the engine's order; everything else,
+    down to the text-mode newline handling, is the original writer.
+    """
+    from MapEngine import project_paths, list_custom_textures, list_map_cubes, load_custom_texture
+    paths = project_paths(folder_path)
+    with open(paths['project_file'], 'r', encoding='utf-8') as file:
+        relevant_section = file.readlines()
+    with open(output_file_path, 'w', encoding='utf-8') as file:
+        file.write("V2\n")
+        file.write((map_name or relevant_section[1]).strip() + '\n')
+        file.write((map_description or relevant_section[2]).strip() + '\n')
+        file.write("§\n")
+        file.write(f"{len(list_map_cubes(paths['map_data']))}\n{len(list_custom_textures(paths['custom_textures']))}\n")
+        file.writelines(line.strip() + '\n' for line in relevant_section[3:])
+        file.write("§\n")
+        for png_path in (paths['icon'], paths['banner']):
+            with open(png_path, 'rb') as png:
+                file.writelines(str(num) + '\n' for num in png.read())
+            file.write("§\n")
+        for image_name, texture_path in list_custom_textures(paths['custom_textures']):
+            file.write(image_name + '\n')
+            file.writelines(str(num) + '\n' for num in load_custom_texture(texture_path))
+            file.write('~\n')
+        file.write("§\n")
+        for cube_path in list_map_cubes(paths['map_data']):
+            with open(cube_path, 'r', encoding='utf-8') as cube:
+                file.writelines(cube.readlines())
+        file.write("§\n")
+
+CHECK_OVERRIDES = [(None, None), ('Other Name', None), (None, 'Other description'), ('Other Name', 'Other description')]
+
+def run_check(args):
+    from MapEngine import export_project
+    mismatches = 0
+    with tempfile.TemporaryDirectory() as temp_dir:
+        folder_path = os.path.join(temp_dir, "BenchmarkProject")
+        generate_from_args(args, folder_path)
+        for map_name, map_description in CHECK_OVERRIDES:
+            output_file_path = os.path.join(temp_dir, "Engine.gbmap")
+            reference_file_path = os.path.join(temp_dir, "Reference.gbmap")
+            export_project(folder_path, output_file_path, map_name, map_description, jobs=args.jobs)
+            write_reference_gbmap(reference_file_path, folder_path, map_name, map_description)
+            with open(output_file_path, 'rb') as output, open(reference_file_path, 'rb') as reference:
+                same = output.read() == reference.read()
+            mismatches += not same
+            print(f"{'OK' if same else 'MISMATCH':<10}name={map_name!r} description={map_description!r}")
+    return 1 if mismatches else 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='MapBenchmark.py', description='GoreBox Map Exporter benchmarks')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    memory_parser = subparsers.add_parser('memory', help='peak RSS of one export of a synthetic project')
+    add_shape_arguments(memory_parser, 200, 2000, 8, 2048)
+    memory_parser.add_argument('-j', '--jobs', type=int, help='texture workers (default: CPU count)')
+    memory_parser.set_defaults(func=run_memory)
+
+    generate_parser = subparsers.add_parser('generate', help='write a synthetic map project folder')
+    generate_parser.add_argument('folder', help='project folder to create')
+    add_shape_arguments(generate_parser, 100, 200, 10, 256)
+    generate_parser.set_defaults(func=run_generate)
+
+    check_parser = subparsers.add_parser('check', help='byte-compare engine exports against the original writer, with and without name/description overrides')
+    add_shape_arguments(check_parser, 20, 50, 4, 64)
+    check_parser.add_argument('-j', '--jobs', type=int, default=1, help='texture workers')
+    check_parser.set_defaults(func=run_check)
+
+    stages_parser = subparsers.add_parser('stages', help='time each export stage on a synthetic project')
+    add_shape_arguments(stages_parser, 200, 2000, 8, 1024)
+    stages_parser.add_argument('--stage', action='append', choices=STAGES, help='only run this stage (repeatable)')
+    stages_parser.add_argument('-r', '--repeat', type=int, default=3, help='runs per stage; the fastest is reported')
+    stages_parser.add_argument('-j', '--jobs', type=int, default=1, help='texture workers for create_gbmap_file')
+    stages_parser.add_argument('--save-baseline', metavar='FILE', help='store the results as a baseline')
+    stages_parser.add_argument('--baseline', metavar='FILE', help='fail if slower or larger than this baseline')
+    stages_parser.add_argument('--tolerance', type=float, default=0.2, help='allowed regression as a fraction (default: 0.2)')
+    stages_parser.set_defaults(func=run_stages)
+
+    startup_parser = subparsers.add_parser('startup', help='time GUI startup to first paint and to a fully indexed Import tab (needs PyQt5)')
+    startup_parser.add_argument('--projects', type=int, default=200, help='synthetic projects under MapProjects')
+    startup_parser.add_argument('-r', '--repeat', type=int, default=3, help='runs; the fastest time of each milestone is reported')
+    startup_parser.add_argument('--warm-cache', action='store_true', help='keep the project index and thumbnails between runs')
+    startup_parser.add_argument('--save-baseline', metavar='FILE', help='store the results as a baseline')
+    startup_parser.add_argument('--baseline', metavar='FILE', help='fail if slower or larger than this baseline')
+    startup_parser.add_argument('--tolerance', type=float, default=0.2, help='allowed regression as a fraction (default: 0.2)')
+    startup_parser.set_defaults(func=run_startup_benchmark)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
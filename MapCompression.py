@@ -0,0 +1,138 @@
+import os
+import gzip
+import shutil
+from collections import deque
+
+COMPRESSED_EXTENSIONS = {'gzip': '.gz', 'zstd': '.zst'}
+DEFAULT_LEVELS = {'gzip': 6, 'zstd': 3}
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+GZIP_BLOCK_SIZE = 4 * 1024 * 1024
+COPY_BUFFER_SIZE = 1024 * 1024
+
+def compressed_output_path(output_file_path, compression):
+    return output_file_path + COMPRESSED_EXTENSIONS[compression]
+
+def import_zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("zstd compression needs the zstandard package (pip install zstandard)")
+    return zstandard
+
+def compress_gzip_block(block, level):
+    # mtime=0 keeps the output reproducible
+    return gzip.compress(block, level, mtime=0)
+
+class ParallelGzipWriter:
+    """Gzip a stream on threads, pigz style.
+
+    The stream is cut into GZIP_BLOCK_SIZE blocks compressed independently as
+    gzip members, which concatenated are still one valid .gz for gzip, gunzip
+    and Python's gzip module. zlib releases the GIL while compressing, so
+    blocks compress in parallel; at most 2 * threads blocks are in flight.
+    """
+
+    def __init__(self, file, level=None, threads=1, block_size=GZIP_BLOCK_SIZE):
+        self.file = file
+        self.level = DEFAULT_LEVELS['gzip'] if level is None else level
+        self.block_size = block_size
+        self.buffer = bytearray()
+        self.pending = deque()
+        self.max_pending = threads * 2
+        self.pool = None
+        if threads > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            self.pool = ThreadPoolExecutor(max_workers=threads)
+
+    def write(self, data):
+        self.buffer += data
+        while len(self.buffer) >= self.block_size:
+            block = bytes(self.buffer[:self.block_size])
+            del self.buffer[:self.block_size]
+            self.submit(block)
+        return len(data)
+
+    def submit(self, block):
+        if self.pool is None:
+            self.file.write(compress_gzip_block(block, self.level))
+            return
+        self.pending.append(self.pool.submit(compress_gzip_block, block, self.level))
+        while len(self.pending) > self.max_pending:
+            self.file.write(self.pending.popleft().result())
+
+    def finish(self):
+        """Compress what is left and write every outstanding block, in order."""
+        if self.buffer:
+            self.submit(bytes(self.buffer))
+            self.buffer.clear()
+        while self.pending:
+            self.file.write(self.pending.popleft().result())
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+
+class ZstdWriter:
+    """Stream to a zstd frame, compressed on threads by libzstd itself."""
+
+    def __init__(self, file, level=None, threads=1):
+        self.zstandard = import_zstandard()
+        compressor = self.zstandard.ZstdCompressor(level=DEFAULT_LEVELS['zstd'] if level is None else level, threads=threads if threads > 1 else 0)
+        self.writer = compressor.stream_writer(file, closefd=False)
+
+    def write(self, data):
+        return self.writer.write(data)
+
+    def finish(self):
+        self.writer.flush(self.zstandard.FLUSH_FRAME)
+
+    def close(self):
+        self.writer.close()
+
+def open_compressor(file, compression, level=None, threads=1):
+    """Return a writer compressing into file; call finish() once everything is written, then close()."""
+    if compression == 'gzip':
+        return ParallelGzipWriter(file, level, threads)
+    if compression == 'zstd':
+        return ZstdWriter(file, level, threads)
+    raise RuntimeError(f"Unknown compression: {compression}")
+
+def detect_compression(file_path):
+    with open(file_path, 'rb') as file:
+        magic = file.read(4)
+    if magic.startswith(GZIP_MAGIC):
+        return 'gzip'
+    if magic == ZSTD_MAGIC:
+        return 'zstd'
+    return None
+
+def decompressed_output_path(file_path):
+    for extension in COMPRESSED_EXTENSIONS.values():
+        if file_path.endswith(extension):
+            return file_path[:-len(extension)]
+    return file_path + ".gbmap"
+
+def decompress_map(file_path, output_file_path=None):
+    """Write the .gbmap inside a .gbmap.gz or .gbmap.zst next to it (or to output_file_path)."""
+    from MapEngine import commit_output, temp_output_path
+    output_file_path = output_file_path or decompressed_output_path(file_path)
+    compression = detect_compression(file_path)
+    if compression is None:
+        raise RuntimeError(f"Error decompressing map: {file_path} is neither gzip nor zstd compressed")
+    write_path = temp_output_path(output_file_path)
+    try:
+        with open(file_path, 'rb') as source, open(write_path, 'xb') as output:
+            if compression == 'gzip':
+                with gzip.GzipFile(fileobj=source) as reader:
+                    shutil.copyfileobj(reader, output, COPY_BUFFER_SIZE)
+            else:
+                import_zstandard().ZstdDecompressor().copy_stream(source, output, write_size=COPY_BUFFER_SIZE)
+            output.flush()
+            os.fsync(output.fileno())
+        commit_output(write_path, output_file_path)
+    except BaseException:
+        if os.path.exists(write_path):
+            os.remove(write_path)
+        raise
+    return output_file_path
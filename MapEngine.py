@@ -0,0 +1,953 @@
+import io
+import os
+import re
+import mmap
+import time
+import hashlib
+import secrets
+from collections import deque
+from contextlib import closing, contextmanager, nullcontext
+
+# The .gbmap format is line based; match the platform line ending a text-mode
+# writer would have produced so binary output stays byte-identical.
+NEWLINE = os.linesep.encode('ascii')
+DECIMAL_LINES = [str(num).encode('ascii') + NEWLINE for num in range(256)]
+# Average encoded size of one uniformly distributed byte, used for estimates
+ENCODED_BYTES_PER_BYTE = sum(map(len, DECIMAL_LINES)) / len(DECIMAL_LINES)
+ENCODE_CHUNK_SIZE = 64 * 1024
+PIPELINE_MAX_BYTES = 64 * 1024 * 1024
+# Textures whose encoded block would be larger are streamed by the writer instead
+PIPELINE_MAX_ITEM_BYTES = 16 * 1024 * 1024
+WRITE_BUFFER_SIZE = 1024 * 1024
+DIGIT_RUNS = re.compile(r'(\d+)')
+
+def timestamp():
+    return time.strftime('%Y-%m-%d %H:%M:%S')
+
+def app_cache_dir():
+    base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "GoreBoxMapExporter")
+
+def default_map_projects_dir():
+    return os.path.join(os.path.expanduser("~"), "AppData", "LocalLow", "F2Games", "GoreBox", "MapProjects")
+
+def default_maps_dir():
+    return os.path.join(os.path.expanduser("~"), "AppData", "LocalLow", "F2Games", "GoreBox", "Maps")
+
+def default_output_file_path():
+    return os.path.join(default_maps_dir(), "CustomMap.gbmap")
+
+def project_paths(folder_path):
+    return {
+        'map_data': os.path.join(folder_path, "MapData"),
+        'custom_textures': os.path.join(folder_path, "CustomTextures"),
+        'project_file': os.path.join(folder_path, "projectFile.gbi"),
+        'icon': os.path.join(folder_path, "icon.png"),
+        'banner': os.path.join(folder_path, "banner.png"),
+    }
+
+def is_valid_map_project(folder_path):
+    required_files = ["projectFile.gbi", "icon.png", "banner.png"]
+    required_folders = ["MapData", "CustomTextures"]
+
+    for file in required_files:
+        if not os.path.exists(os.path.join(folder_path, file)):
+            return False
+
+    for folder in required_folders:
+        if not os.path.exists(os.path.join(folder_path, folder)):
+            return False
+
+    return True
+
+def project_input_files(folder_path):
+    """Every file an export of folder_path reads, in a stable order."""
+    paths = project_paths(folder_path)
+    files = [paths['project_file'], paths['icon'], paths['banner']]
+    files += sorted(texture_path for _, texture_path in list_custom_textures(paths['custom_textures']))
+    files += list_map_cubes(paths['map_data'])
+    return files
+
+def project_fingerprint(folder_path, *extra):
+    """Hash the path, size and mtime of every input of a project (plus any export options)."""
+    digest = hashlib.sha256(repr(extra).encode('utf-8'))
+    for file_path in project_input_files(folder_path):
+        stat = os.stat(file_path)
+        digest.update(f"{os.path.relpath(file_path, folder_path)}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+def convert_png_to_ints(file_path):
+    try:
+        with open(file_path, 'rb') as file:
+            byte_data = file.read()
+        return list(byte_data)
+    except Exception as e:
+        raise RuntimeError(f"Error converting PNG to ints: {e}")
+
+def file_digest(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(WRITE_BUFFER_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def read_png_bytes(file_path):
+    try:
+        with open(file_path, 'rb') as file:
+            return file.read()
+    except Exception as e:
+        raise RuntimeError(f"Error reading PNG: {e}")
+
+def map_file(file_path):
+    """Return a read-only mmap of file_path (or b'' for an empty file, which cannot be mapped)."""
+    try:
+        with open(file_path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return b''
+            source = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except Exception as e:
+        raise RuntimeError(f"Error reading PNG: {e}")
+    if hasattr(mmap, 'MADV_SEQUENTIAL'):
+        source.madvise(mmap.MADV_SEQUENTIAL)
+    return source
+
+def close_source(source):
+    if isinstance(source, mmap.mmap):
+        source.close()
+
+def iter_source_chunks(source, chunk_size=ENCODE_CHUNK_SIZE):
+    """Yield memoryview chunks of a buffer.
+
+    For an mmap, pages already consumed are dropped from the process with
+    MADV_DONTNEED where supported, so resident memory stays around one chunk
+    however large the file is.
+    """
+    view = memoryview(source)
+    release = isinstance(source, mmap.mmap) and hasattr(mmap, 'MADV_DONTNEED') and chunk_size % mmap.PAGESIZE == 0
+    for start in range(0, len(view), chunk_size):
+        yield view[start:start + chunk_size]
+        if release:
+            source.madvise(mmap.MADV_DONTNEED, start, min(chunk_size, len(view) - start))
+    view.release()
+
+def encode_bytes_to_lines(data):
+    """Return a bytes-like buffer in the .gbmap one-decimal-per-line form."""
+    return b''.join(map(DECIMAL_LINES.__getitem__, data))
+
+def write_encoded_bytes(file, data, chunk_size=ENCODE_CHUNK_SIZE, mirror=None):
+    """Encode data into a binary stream in chunks, without per-byte int objects.
+
+    If mirror is given every encoded chunk is written to it as well.
+    """
+    for source_chunk in iter_source_chunks(data, chunk_size):
+        chunk = encode_bytes_to_lines(source_chunk)
+        source_chunk.release()
+        file.write(chunk)
+        if mirror is not None:
+            mirror.write(chunk)
+
+def texture_variant(file_path, optimize=False, max_dimension=None):
+    """Describe everything besides the source content that changes a texture's encoded block."""
+    variant = os.path.splitext(file_path)[1].lstrip('.').lower() + ('-crlf' if NEWLINE == b'\r\n' else '')
+    if optimize:
+        variant += f"-opt{max_dimension or ''}"
+    return variant
+
+def texture_cache_key(cache, file_path, optimize=False, max_dimension=None):
+    """Return a content key for a texture's encoded block.
+
+    Without a cache a key is only computed (by hashing the file) when
+    optimising, where it is also used to spot duplicate textures.
+    """
+    variant = texture_variant(file_path, optimize, max_dimension)
+    if cache is not None:
+        return cache.key(file_path, variant)
+    if optimize:
+        return f"{file_digest(file_path)}.{variant}"
+    return None
+
+def write_texture_block(file, data, cache=None, key=None):
+    """Write an encoded texture block, storing a copy in the texture cache."""
+    if cache is None:
+        write_encoded_bytes(file, data)
+        return
+    with cache.store_block(key) as block:
+        write_encoded_bytes(file, data, mirror=block)
+
+def write_encoded_block(file, encoded, cache=None, key=None):
+    """Write a texture block that is already encoded, storing a copy in the texture cache."""
+    file.write(encoded)
+    if cache is not None:
+        with cache.store_block(key) as block:
+            block.write(encoded)
+
+def write_png_section(file, file_path, cache=None):
+    key = texture_cache_key(cache, file_path)
+    if cache is None or not cache.copy_block(key, file):
+        with opened_texture_source(file_path) as source:
+            write_texture_block(file, source, cache, key)
+
+class ExportCancelled(RuntimeError):
+    pass
+
+def temp_output_path(output_file_path):
+    """Return a fresh, hidden sibling path to build output_file_path in."""
+    directory, name = os.path.split(os.path.abspath(output_file_path))
+    return os.path.join(directory, f".{name}.{secrets.token_hex(4)}.tmp")
+
+def commit_output(temp_path, output_file_path):
+    """Atomically move a fully written and fsynced temp file into place."""
+    os.replace(temp_path, output_file_path)
+    if hasattr(os, 'O_DIRECTORY'):
+        # Persist the rename itself; not supported (or needed) on Windows
+        try:
+            directory_fd = os.open(os.path.dirname(os.path.abspath(output_file_path)), os.O_RDONLY | os.O_DIRECTORY)
+        except OSError:
+            return
+        try:
+            os.fsync(directory_fd)
+        except OSError:
+            pass
+        finally:
+            os.close(directory_fd)
+
+def copy_file_range_into(source, file, offset, length):
+    """Append length bytes of source starting at offset to the buffered binary file.
+
+    Uses os.copy_file_range where the platform has it so the copy stays in the
+    kernel, falling back to plain reads.
+    """
+    file.flush()
+    if hasattr(os, 'copy_file_range') and getattr(file, 'kernel_copy', True):
+        source_fd, target_fd = source.fileno(), file.fileno()
+        try:
+            while length > 0:
+                copied = os.copy_file_range(source_fd, target_fd, length, offset)
+                if copied == 0:
+                    break
+                offset += copied
+                length -= copied
+        except OSError:
+            pass
+        # The raw fd moved behind the buffered writer; resync its position
+        file.seek(0, os.SEEK_END)
+    source.seek(offset)
+    while length > 0:
+        chunk = source.read(min(length, WRITE_BUFFER_SIZE))
+        if not chunk:
+            raise RuntimeError("previous export is shorter than its index")
+        file.write(chunk)
+        length -= len(chunk)
+
+class MirroredWriter:
+    """A binary file wrapper that also passes every byte written to mirror.write().
+
+    Copies made in the kernel would bypass the mirror, so copy_file_range_into()
+    uses plain reads and writes for it (kernel_copy is False).
+    """
+    kernel_copy = False
+
+    def __init__(self, file, mirror):
+        self.file = file
+        self.mirror = mirror
+
+    def write(self, data):
+        self.file.write(data)
+        self.mirror.write(data)
+        return len(data)
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+def translate_newlines(data, pending_cr=False):
+    """Apply text-mode newline handling (\\r\\n and \\r read as \\n, written as NEWLINE) to bytes.
+
+    Returns the translated bytes and whether data ended in a \\r that may pair
+    with a \\n at the start of the next chunk.
+    """
+    if pending_cr:
+        data = b'\r' + data
+    pending_cr = data.endswith(b'\r')
+    if pending_cr:
+        data = data[:-1]
+    data = data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    if NEWLINE != b'\n':
+        data = data.replace(b'\n', NEWLINE)
+    return data, pending_cr
+
+def write_map_cube(file, cube_path, passthrough=False):
+    """Copy a .mapCube into the output as raw bytes and return whether it ends with a newline.
+
+    By default blocks without a \\r are copied untouched on LF platforms and
+    the rest get the same newline translation the old text-mode writer did.
+    With passthrough=True the file is copied verbatim, kernel-side where the
+    platform allows, which skips newline translation entirely.
+    """
+    with open(cube_path, 'rb') as cube_file:
+        size = os.fstat(cube_file.fileno()).st_size
+        if size == 0:
+            return True
+        if passthrough:
+            copy_file_range_into(cube_file, file, 0, size)
+            cube_file.seek(size - 1)
+            return cube_file.read(1) in (b'\n', b'\r')
+        pending_cr = False
+        last = b''
+        for chunk in iter(lambda: cube_file.read(WRITE_BUFFER_SIZE), b''):
+            if not pending_cr and NEWLINE == b'\n' and b'\r' not in chunk:
+                file.write(chunk)
+            else:
+                translated, pending_cr = translate_newlines(chunk, pending_cr)
+                file.write(translated)
+            last = chunk[-1:]
+        if pending_cr:
+            file.write(NEWLINE)
+        return last in (b'\n', b'\r')
+
+def write_line(file, text):
+    file.write(text.encode('utf-8') + NEWLINE)
+
+def write_ints_to_file(ints, image_name, output_filepath):
+    try:
+        with open(output_filepath, 'wb') as file:
+            write_line(file, image_name)
+            write_encoded_bytes(file, bytes(ints))
+            write_line(file, '~')
+    except Exception as e:
+        raise RuntimeError(f"Error writing ints to file: {e}")
+
+def read_project_file(file_path):
+    try:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            return file.readlines()
+    except Exception as e:
+        raise RuntimeError(f"Error reading project file: {e}")
+
+def natural_sort_key(name):
+    """Sort key that orders embedded numbers by value, so cube2 comes before cube10."""
+    parts = DIGIT_RUNS.split(name.casefold())
+    # Odd parts are the digit runs; the name itself breaks ties such as cube01 and cube1
+    parts[1::2] = map(int, parts[1::2])
+    return parts, name
+
+def iter_map_cube_entries(map_data_path, ordered=True):
+    """Yield an os.DirEntry for every .mapCube under map_data_path, subdirectories included.
+
+    Each directory is read once with os.scandir and, when ordered, its
+    entries are naturally sorted and subdirectories are walked in place, so
+    the order is the same on every machine and filesystem. Only the listing
+    of the directory being walked is held in memory.
+    """
+    with os.scandir(map_data_path) as scan:
+        entries = list(scan)
+    if ordered:
+        entries.sort(key=lambda entry: natural_sort_key(entry.name))
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield from iter_map_cube_entries(entry.path, ordered)
+        elif entry.name.endswith(".mapCube"):
+            yield entry
+
+def scan_map_cubes(map_data_path):
+    """Return (cube paths in export order, their total size in bytes) from a single directory pass."""
+    map_cubes = []
+    total = 0
+    try:
+        for entry in iter_map_cube_entries(map_data_path):
+            map_cubes.append(entry.path)
+            total += entry.stat().st_size
+    except Exception as e:
+        raise RuntimeError(f"Error reading map cubes: {e}")
+    return map_cubes, total
+
+def list_map_cubes(map_data_path):
+    try:
+        return [entry.path for entry in iter_map_cube_entries(map_data_path)]
+    except Exception as e:
+        raise RuntimeError(f"Error reading map cubes: {e}")
+
+def read_map_cubes(map_data_path):
+    map_cubes = []
+    try:
+        for file_path in list_map_cubes(map_data_path):
+            with open(file_path, 'r', encoding='utf-8') as file:
+                map_cubes.append(file.readlines())
+    except Exception as e:
+        raise RuntimeError(f"Error reading map cubes: {e}")
+    return map_cubes
+
+def convert_jpg_to_png(jpg_path):
+    """Return the PNG bytes of a JPG, converted in memory so nothing is written next to it."""
+    # PIL is only needed for JPG textures, so keep it off the import path
+    from PIL import Image
+    try:
+        output = io.BytesIO()
+        with Image.open(jpg_path) as img:
+            img.save(output, 'PNG')
+        return output.getvalue()
+    except Exception as e:
+        raise RuntimeError(f"Error converting JPG to PNG: {e}")
+
+def texture_image_name(file_path):
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+def list_custom_textures(custom_textures_path):
+    """Return (image_name, file_path) pairs without reading any texture data."""
+    custom_textures = []
+    try:
+        # Natural order, like map cubes, so the output is the same on every machine
+        for filename in sorted(os.listdir(custom_textures_path), key=natural_sort_key):
+            if filename.endswith(".png") or filename.endswith(".jpg"):
+                custom_textures.append((texture_image_name(filename), os.path.join(custom_textures_path, filename)))
+    except Exception as e:
+        raise RuntimeError(f"Error reading custom textures: {e}")
+    return custom_textures
+
+def apply_texture_overrides(custom_textures, overrides):
+    """Return custom_textures with the source of each overridden image name replaced.
+
+    overrides maps an image name to the PNG or JPG file to export under that
+    name instead; the project folder itself is never modified.
+    """
+    if not overrides:
+        return custom_textures
+    return [(image_name, overrides.get(image_name, file_path)) for image_name, file_path in custom_textures]
+
+def unmatched_texture_overrides(custom_textures, overrides):
+    """Return the override names, sorted, that match no custom texture and so would be ignored."""
+    names = {image_name for image_name, _ in custom_textures}
+    return sorted(name for name in (overrides or {}) if name not in names)
+
+def load_custom_texture(file_path, optimize=False, max_dimension=None):
+    """Return the PNG bytes of a texture, converting JPGs in memory.
+
+    With optimize the PNG is recompressed losslessly and, if max_dimension is
+    set, downsized to fit it; see TextureOptimizer.optimize_png().
+    """
+    data = convert_jpg_to_png(file_path) if file_path.endswith(".jpg") else read_png_bytes(file_path)
+    if optimize:
+        from TextureOptimizer import optimize_png
+        try:
+            data = optimize_png(data, max_dimension)
+        except Exception as e:
+            raise RuntimeError(f"Error optimizing texture {file_path}: {e}")
+    return data
+
+def open_texture_source(file_path):
+    """Return a buffer over a texture's PNG data: an mmap for PNGs, converted bytes for JPGs.
+
+    Release it with close_source() once written.
+    """
+    if file_path.endswith(".jpg"):
+        return load_custom_texture(file_path)
+    return map_file(file_path)
+
+@contextmanager
+def opened_texture_source(file_path):
+    source = open_texture_source(file_path)
+    try:
+        yield source
+    finally:
+        close_source(source)
+
+def default_jobs():
+    return os.cpu_count() or 1
+
+def readahead(file_path):
+    """Ask the OS to start reading a file into the page cache without waiting for it."""
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        fd = os.open(file_path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    finally:
+        os.close(fd)
+
+def custom_texture_source(file_path, optimize=False, max_dimension=None):
+    """Return a buffer over a custom texture's PNG data, to release with close_source()."""
+    return load_custom_texture(file_path, optimize, max_dimension) if optimize else open_texture_source(file_path)
+
+def iter_custom_texture_data(custom_textures, optimize=False, max_dimension=None):
+    """Yield (image_name, source) in the order of custom_textures, one at a time.
+
+    Each source is a buffer from custom_texture_source() that the caller must
+    release with close_source().
+    """
+    for image_name, file_path in custom_textures:
+        yield image_name, custom_texture_source(file_path, optimize, max_dimension)
+
+def encode_texture(file_path, optimize=False, max_dimension=None):
+    """Worker entry point: return (encoded block, PNG size) of a texture."""
+    data = load_custom_texture(file_path, optimize, max_dimension)
+    return encode_bytes_to_lines(data), len(data)
+
+def iter_encoded_textures(custom_textures, jobs, optimize=False, max_dimension=None, max_bytes=PIPELINE_MAX_BYTES, max_item_bytes=PIPELINE_MAX_ITEM_BYTES, pool=None):
+    """Yield (image_name, encoded block, PNG size) in the order of custom_textures.
+
+    A process pool reads and encodes the textures in a window of at most
+    2 * jobs textures and about max_bytes of estimated encoded output, while
+    the caller writes them in order. Textures estimated above max_item_bytes
+    are not encoded in the pool and come back as (image_name, None, None) for
+    the caller to stream from custom_texture_source(). An existing pool can be
+    passed in to reuse warm workers; it is left running.
+    """
+    own_pool = pool is None
+    if own_pool:
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(max_workers=jobs)
+    pending = deque()
+    in_flight = 0
+    remaining = iter(custom_textures)
+    upcoming = next(remaining, None)
+
+    try:
+        while pending or upcoming is not None:
+            while upcoming is not None and len(pending) < jobs * 2:
+                image_name, file_path = upcoming
+                size = estimated_texture_size(file_path)
+                if size > max_item_bytes:
+                    pending.append((image_name, 0, None))
+                else:
+                    if pending and in_flight + size > max_bytes:
+                        break
+                    readahead(file_path)
+                    pending.append((image_name, size, pool.submit(encode_texture, file_path, optimize, max_dimension)))
+                    in_flight += size
+                upcoming = next(remaining, None)
+            image_name, size, future = pending.popleft()
+            if future is None:
+                yield image_name, None, None
+                continue
+            encoded, png_size = future.result()
+            in_flight -= size
+            yield image_name, encoded, png_size
+    finally:
+        if own_pool:
+            pool.shutdown(wait=True, cancel_futures=True)
+        else:
+            for _, _, future in pending:
+                if future is not None:
+                    future.cancel()
+
+def read_custom_textures(custom_textures_path):
+    custom_textures = []
+    try:
+        for image_name, file_path in list_custom_textures(custom_textures_path):
+            custom_textures.append((image_name, list(load_custom_texture(file_path))))
+    except Exception as e:
+        raise RuntimeError(f"Error reading custom textures: {e}")
+    return custom_textures
+
+def trace_stage(trace, name):
+    """Time a stage on an optional ExportTrace."""
+    return trace.stage(name) if trace is not None else nullcontext()
+
+def report(progress, kind, value):
+    if progress is not None:
+        progress(kind, value)
+
+class ProgressReporter:
+    """Coalesce 'action' and 'progress' reports to at most max_rate per second.
+
+    Progress is tracked in estimated output bytes via advance(); console
+    messages ('basic' and 'advanced') and per-record 'detail' messages, meant
+    for log files only, are passed through immediately.
+    """
+
+    def __init__(self, progress, total=0, max_rate=10):
+        self.progress = progress
+        self.total = total
+        self.done = 0
+        self.interval = 1 / max_rate
+        self.last_emit = float('-inf')
+        self.pending_action = None
+        self.last_percent = None
+
+    def __call__(self, kind, value):
+        if kind == 'action':
+            self.pending_action = value
+            self.emit()
+        elif kind == 'progress':
+            self.done = self.total * value / 100
+            self.emit()
+        else:
+            report(self.progress, kind, value)
+
+    def advance(self, amount):
+        self.done += amount
+        self.emit()
+
+    def emit(self, force=False):
+        now = time.monotonic()
+        if not force and now - self.last_emit < self.interval:
+            return
+        self.last_emit = now
+        if self.pending_action is not None:
+            report(self.progress, 'action', self.pending_action)
+            self.pending_action = None
+        percent = min(100, int(self.done * 100 / self.total)) if self.total else 0
+        if percent != self.last_percent:
+            self.last_percent = percent
+            report(self.progress, 'progress', percent)
+
+    def flush(self):
+        self.emit(force=True)
+
+def estimated_texture_size(file_path):
+    return int(os.path.getsize(file_path) * ENCODED_BYTES_PER_BYTE)
+
+def estimate_gbmap_size(icon_file_path, banner_file_path, custom_textures, map_cubes, cube_bytes=None):
+    """Roughly estimate the size of the .gbmap these inputs produce, from file sizes alone.
+
+    cube_bytes, the total size of map_cubes if already known (see
+    scan_map_cubes()), saves a stat of every cube.
+    """
+    total = estimated_texture_size(icon_file_path) + estimated_texture_size(banner_file_path)
+    total += sum(estimated_texture_size(texture_path) for _, texture_path in custom_textures)
+    total += cube_bytes if cube_bytes is not None else sum(os.path.getsize(cube_path) for cube_path in map_cubes)
+    return total
+
+def create_gbmap_file(output_file_path, project_file_path, icon_file_path, banner_file_path, custom_textures, map_cubes, *, map_name=None, map_description=None, progress=None, jobs=1, cache=None, incremental=False, cancelled=None, cube_passthrough=False, optimize=False, max_texture_size=None, trace=None, compression=None, compression_level=None, compression_threads=1, encode_pool=None, cube_bytes=None):
+    """Stream a .gbmap to a temp file one record at a time and rename it into place.
+
+    custom_textures is a list of (image_name, file_path) pairs and map_cubes a
+    list of .mapCube paths. The keyword options are described on
+    export_project(); cube_bytes is the total cube size if already known.
+    """
+    previous = None
+    index = None
+    if incremental:
+        from ExportIndex import ExportIndex, input_signature
+        previous = ExportIndex.load(output_file_path)
+        index = ExportIndex(output_file_path)
+    write_path = temp_output_path(output_file_path)
+    compressed_path = compressed_write_path = None
+    if compression:
+        from MapCompression import compressed_output_path, open_compressor
+        compressed_path = compressed_output_path(output_file_path, compression)
+        compressed_write_path = temp_output_path(compressed_path)
+    reused = 0
+    progress = ProgressReporter(progress)
+
+    try:
+        progress.total = estimate_gbmap_size(icon_file_path, banner_file_path, custom_textures, map_cubes, cube_bytes)
+
+        with open(write_path, 'xb', buffering=WRITE_BUFFER_SIZE) as output, open(project_file_path, 'r', encoding='utf-8') as project_file, \
+                open(output_file_path, 'rb') if previous is not None else nullcontext() as previous_file, \
+                open(compressed_write_path, 'xb', buffering=WRITE_BUFFER_SIZE) if compression else nullcontext() as compressed_file, \
+                closing(open_compressor(compressed_file, compression, compression_level, compression_threads)) if compression else nullcontext() as compressor:
+            file = MirroredWriter(output, compressor) if compressor is not None else output
+
+            root = os.path.join(os.path.dirname(project_file_path), "")
+            # A reused record still to be copied as [offset in previous file, length]
+            pending = None
+
+            def signature(kind, file_path, *extra, stat=None):
+                return input_signature(kind, file_path, *extra, root=root, stat=stat) if index is not None else None
+
+            def flush_reused():
+                nonlocal pending
+                if pending is not None:
+                    copy_file_range_into(previous_file, file, *pending)
+                    pending = None
+
+            def reuse(record_signature):
+                """Queue the previous record for record_signature to be copied and return its new (start, length)."""
+                nonlocal reused, pending
+                span = previous.find(record_signature) if previous is not None else None
+                if span is None:
+                    return None
+                offset, length = span
+                if pending is not None and pending[0] + pending[1] == offset:
+                    # Adjacent in the previous file as well, so one copy covers both
+                    start = file.tell() + pending[1]
+                    pending[1] += length
+                else:
+                    flush_reused()
+                    start = file.tell()
+                    pending = [offset, length]
+                index.add(record_signature, start, length)
+                reused += 1
+                return start, length
+
+            def write_record(stage, input_path, record_signature, write, input_size=None):
+                """Write one record with write(), which may return extra trace fields.
+
+                Only cube records follow each other directly, so only they are left
+                queued for flush_reused() to copy as one run.
+                """
+                if cancelled is not None and cancelled():
+                    raise ExportCancelled("Export cancelled")
+                record_start = time.perf_counter()
+                span = reuse(record_signature)
+                if span is not None:
+                    start, length = span
+                    extra = {'source': 'reused'}
+                else:
+                    flush_reused()
+                    start = file.tell()
+                    extra = write() or {}
+                    length = file.tell() - start
+                    if index is not None:
+                        index.add(record_signature, start, length)
+                if stage != 'cubes':
+                    flush_reused()
+                seconds = time.perf_counter() - record_start
+                if trace is not None:
+                    trace.record(stage, os.path.basename(input_path), seconds, input_size if input_size is not None else os.path.getsize(input_path), length, **extra)
+                report(progress, 'detail', f"{timestamp()} {stage} {os.path.basename(input_path)}: {length} bytes in {seconds * 1000:.1f}ms ({extra.get('source', 'written')})")
+                return start, length
+
+            def copy_written(span):
+                file.flush()
+                with open(write_path, 'rb') as written:
+                    copy_file_range_into(written, file, *span)
+
+            with trace_stage(trace, 'header'):
+                report(progress, 'action', "Writing version to file")
+                write_line(file, "V2")
+
+                report(progress, 'action', "Writing relevant section to file")
+                next(project_file)
+                # Lines 1 and 2 are always consumed, used or not, so overrides never shift the rest
+                name_line, description_line = next(project_file), next(project_file)
+                write_line(file, (map_name or name_line).strip())
+                write_line(file, (map_description or description_line).strip())
+
+                report(progress, 'action', "Writing section delimiter")
+                write_line(file, "§")
+
+                report(progress, 'action', "Writing map cube and custom texture counts")
+                write_line(file, str(len(map_cubes)))
+                write_line(file, str(len(custom_textures)))
+
+                report(progress, 'action', "Writing remaining relevant section to file")
+                for line in project_file:
+                    write_line(file, line.strip())
+
+                report(progress, 'action', "Writing section delimiter")
+                write_line(file, "§")
+
+            with trace_stage(trace, 'icon'):
+                report(progress, 'action', "Writing icon data to file")
+                write_record('icon', icon_file_path, signature('texture', icon_file_path), lambda: write_png_section(file, icon_file_path, cache))
+                progress.advance(estimated_texture_size(icon_file_path))
+
+            report(progress, 'action', "Writing section delimiter")
+            write_line(file, "§")
+
+            with trace_stage(trace, 'banner'):
+                report(progress, 'action', "Writing banner data to file")
+                write_record('banner', banner_file_path, signature('texture', banner_file_path), lambda: write_png_section(file, banner_file_path, cache))
+                progress.advance(estimated_texture_size(banner_file_path))
+
+            report(progress, 'action', "Writing section delimiter")
+            write_line(file, "§")
+
+            with trace_stage(trace, 'textures'):
+                texture_signatures = [signature('texture', texture_path, *((optimize, max_texture_size) if optimize else ())) for _, texture_path in custom_textures]
+                reusable = [previous is not None and previous.find(record_signature) is not None for record_signature in texture_signatures]
+                texture_keys = [None if is_reusable else texture_cache_key(cache, texture_path, optimize, max_texture_size) for (_, texture_path), is_reusable in zip(custom_textures, reusable)]
+                cached = [cache is not None and key is not None and cache.has_block(key) for key in texture_keys]
+                first_with_key = {}
+                duplicate_of = [None] * len(custom_textures)
+                if optimize:
+                    for idx, key in enumerate(texture_keys):
+                        if key is not None:
+                            duplicate_of[idx] = first_with_key.setdefault(key, idx)
+                            if duplicate_of[idx] == idx:
+                                duplicate_of[idx] = None
+                to_load = [texture for idx, texture in enumerate(custom_textures) if not (reusable[idx] or cached[idx] or duplicate_of[idx] is not None)]
+                block_spans = [None] * len(custom_textures)
+                optimized_before = optimized_after = 0
+                pipelined = jobs > 1 and len(to_load) > 1
+                if pipelined:
+                    loaded_textures = iter_encoded_textures(to_load, jobs, optimize, max_texture_size, pool=encode_pool)
+                else:
+                    loaded_textures = iter_custom_texture_data(to_load, optimize, max_texture_size)
+                with closing(loaded_textures):
+                    for idx, (image_name, texture_path) in enumerate(custom_textures):
+                        report(progress, 'action', f"Writing custom texture: {image_name}")
+                        write_line(file, image_name)
+                        key = texture_keys[idx]
+
+                        def write_texture():
+                            nonlocal optimized_before, optimized_after
+                            if cached[idx]:
+                                if cache.copy_block(key, file):
+                                    return {'source': 'cache'}
+                                # Evicted since it was checked; fall back to encoding it here
+                                write_texture_block(file, load_custom_texture(texture_path, optimize, max_texture_size), cache, key)
+                                return {'source': 'encoded'}
+                            if duplicate_of[idx] is not None:
+                                copy_written(block_spans[duplicate_of[idx]])
+                                return {'source': 'duplicate'}
+                            if reusable[idx]:
+                                # Only reached if the previous record vanished mid-export
+                                write_texture_block(file, load_custom_texture(texture_path, optimize, max_texture_size))
+                                return {'source': 'encoded'}
+                            # Time spent waiting shows whether reading/encoding textures keeps up with writing
+                            wait_start = time.perf_counter()
+                            loaded = next(loaded_textures)
+                            wait = time.perf_counter() - wait_start
+                            if pipelined and loaded[1] is not None:
+                                png_size = loaded[2]
+                                write_encoded_block(file, loaded[1], cache, key)
+                            else:
+                                # Serial, or too large to hold encoded: stream it in chunks
+                                source = loaded[1] if not pipelined else custom_texture_source(texture_path, optimize, max_texture_size)
+                                try:
+                                    png_size = len(source)
+                                    write_texture_block(file, source, cache, key)
+                                finally:
+                                    close_source(source)
+                            if optimize and texture_path.endswith(".png"):
+                                optimized_before += os.path.getsize(texture_path)
+                                optimized_after += png_size
+                            return {'source': 'jpg' if texture_path.endswith(".jpg") else 'png', 'wait': wait}
+
+                        block_spans[idx] = write_record('textures', texture_path, texture_signatures[idx], write_texture)
+                        write_line(file, "~")
+                        progress.advance(estimated_texture_size(texture_path))
+
+                if optimize:
+                    duplicates = sum(1 for first in duplicate_of if first is not None)
+                    report(progress, 'advanced', f"{timestamp()} Texture optimisation: {optimized_before} -> {optimized_after} PNG bytes, saving ~{int((optimized_before - optimized_after) * ENCODED_BYTES_PER_BYTE)} output bytes; {duplicates} duplicate texture(s) encoded once")
+
+            report(progress, 'action', "Writing section delimiter")
+            write_line(file, "§")
+
+            with trace_stage(trace, 'cubes'):
+                unterminated_cubes = []
+                for idx, cube_path in enumerate(map_cubes):
+                    report(progress, 'action', f"Writing map cube data {idx + 1}/{len(map_cubes)}")
+
+                    def write_cube():
+                        if not write_map_cube(file, cube_path, cube_passthrough):
+                            unterminated_cubes.append(cube_path)
+
+                    stat = os.stat(cube_path)
+                    # Passthrough skips newline translation, so records written with and without it differ
+                    write_record('cubes', cube_path, signature('cube', cube_path, *(('passthrough',) if cube_passthrough else ()), stat=stat), write_cube, stat.st_size)
+                    progress.advance(stat.st_size)
+                flush_reused()
+
+                if unterminated_cubes:
+                    report(progress, 'advanced', f"{timestamp()} Warning: {len(unterminated_cubes)} map cube(s) do not end with a newline and run into the next cube, e.g. {unterminated_cubes[0]}")
+
+            report(progress, 'action', "Writing final section delimiter")
+            write_line(file, "§")
+            if compressor is not None:
+                with trace_stage(trace, 'compress'):
+                    compressor.finish()
+            with trace_stage(trace, 'fsync'):
+                file.flush()
+                os.fsync(file.fileno())
+                if compressor is not None:
+                    compressed_file.flush()
+                    os.fsync(compressed_file.fileno())
+            progress.flush()
+
+        with trace_stage(trace, 'commit'):
+            commit_output(write_path, output_file_path)
+            if index is not None:
+                index.save()
+            if compression:
+                commit_output(compressed_write_path, compressed_path)
+                report(progress, 'advanced', f"{timestamp()} Compressed copy: {compressed_path} ({os.path.getsize(compressed_path)} of {os.path.getsize(output_file_path)} bytes)")
+        if index is not None:
+            report(progress, 'advanced', f"{timestamp()} Incremental export: reused {reused} of {len(index.records)} records")
+    except BaseException as e:
+        for path in (write_path, compressed_write_path):
+            if path is not None and os.path.exists(path):
+                os.remove(path)
+        if isinstance(e, ExportCancelled) or not isinstance(e, Exception):
+            raise
+        if isinstance(e, StopIteration):
+            e = "project file has fewer than 3 lines"
+        report(progress, 'advanced', f"{timestamp()} Error creating gbmap file: {e}")
+        raise RuntimeError(f"Error creating gbmap file: {e}")
+
+def export_project(folder_path, output_file_path, map_name=None, map_description=None, progress=None, *, jobs=None, cache=None, incremental=False, cancelled=None, cube_passthrough=False, optimize=False, max_texture_size=None, texture_overrides=None, trace=None, compression=None, compression_level=None, compression_threads=None, validate=True, encode_pool=None, changed_paths=None):
+    """Export a MapProjects folder to a .gbmap without touching Qt.
+
+    progress is called as progress(kind, value). jobs sets the texture
+    encoding workers (default: CPU count), cache is a TextureCache and
+    incremental copies unchanged records from the previous export.
+    cancelled is polled between records. compression ('gzip' or 'zstd')
+    writes a compressed copy alongside. Unless validate is False every input
+    (only changed_paths, or with incremental only inputs changed since the
+    last export) is checked before anything is written.
+    """
+    if jobs is None:
+        jobs = default_jobs()
+    if compression_threads is None:
+        compression_threads = jobs
+
+    report(progress, 'basic', "Initializing script execution...")
+    report(progress, 'advanced', f"{timestamp()} Initializing script execution...")
+
+    paths = project_paths(folder_path)
+
+    report(progress, 'advanced', f"{timestamp()} Validating required files and folders...")
+    if not all(os.path.exists(path) for path in paths.values()):
+        report(progress, 'basic', "Critical files or folders are missing.")
+        report(progress, 'advanced', f"{timestamp()} Critical files or folders are missing.")
+        raise RuntimeError("Critical files or folders are missing.")
+
+    if validate:
+        from ProjectValidator import validate_project
+        export_index = None
+        if incremental and changed_paths is None:
+            # Inputs unchanged since the last successful export passed validation then
+            from ExportIndex import ExportIndex
+            export_index = ExportIndex.load(output_file_path)
+        with trace_stage(trace, 'validate'):
+            validation = validate_project(folder_path, jobs, texture_overrides, changed_paths, export_index)
+        for warning in validation['warnings']:
+            report(progress, 'advanced', f"{timestamp()} Warning: {warning}")
+        if validation['errors']:
+            for error in validation['errors']:
+                report(progress, 'basic', error)
+                report(progress, 'advanced', f"{timestamp()} Error: {error}")
+            raise RuntimeError(f"Project validation found {len(validation['errors'])} problem(s), nothing was written.")
+        checked = f"{validation['checked']} changed input(s) of " if changed_paths is not None or export_index is not None else ""
+        report(progress, 'advanced', f"{timestamp()} Validated {checked}{validation['textures']} textures and {validation['cubes']} map cubes; estimated output {validation['estimated_size'] / 1e6:.1f} MB in about {validation['estimated_seconds']:.0f}s")
+
+    with trace_stage(trace, 'list'):
+        report(progress, 'basic', "Gathering custom texture data...")
+        report(progress, 'advanced', f"{timestamp()} Listing custom textures: {paths['custom_textures']}")
+        custom_textures = list_custom_textures(paths['custom_textures'])
+        if texture_overrides:
+            unmatched = unmatched_texture_overrides(custom_textures, texture_overrides)
+            if unmatched:
+                report(progress, 'basic', f"No custom texture is named {', '.join(map(repr, unmatched))}; nothing was written.")
+                raise RuntimeError(f"Texture override(s) match no custom texture: {', '.join(unmatched)}")
+            report(progress, 'advanced', f"{timestamp()} Applying {len(texture_overrides)} texture override(s)")
+            custom_textures = apply_texture_overrides(custom_textures, texture_overrides)
+
+        report(progress, 'basic', "Gathering map cube data...")
+        report(progress, 'advanced', f"{timestamp()} Listing map cubes: {paths['map_data']}")
+        map_cubes, cube_bytes = scan_map_cubes(paths['map_data'])
+
+    report(progress, 'basic', "Compiling gbmap file...")
+    report(progress, 'advanced', f"{timestamp()} Creating gbmap file: {output_file_path}")
+    create_gbmap_file(
+        output_file_path, paths['project_file'], paths['icon'], paths['banner'], custom_textures, map_cubes,
+        map_name=map_name, map_description=map_description, progress=progress, jobs=jobs, cache=cache,
+        incremental=incremental, cancelled=cancelled, cube_passthrough=cube_passthrough,
+        optimize=optimize, max_texture_size=max_texture_size, trace=trace,
+        compression=compression, compression_level=compression_level, compression_threads=compression_threads,
+        encode_pool=encode_pool, cube_bytes=cube_bytes,
+    )
+    if cache is not None:
+        report(progress, 'advanced', f"{timestamp()} Texture cache: {cache.hits} hits, {cache.misses} misses")
+    if trace is not None:
+        for line in trace.summary_lines():
+            report(progress, 'advanced', f"{timestamp()} {line}")
+
+    report(progress, 'basic', "Map file creation successful!")
+    report(progress, 'advanced', f"{timestamp()} Map file creation successful!")
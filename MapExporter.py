@@ -1,626 +1,295 @@
-import os
-import shutil
-from PIL import Image
-import sys
-import traceback
-import time
-from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QLabel, QPushButton, QFileDialog, QMessageBox, QTextEdit, QHBoxLayout, QProgressBar, QTabWidget, QLineEdit, QTabBar, QScrollArea, QGridLayout
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QDateTime, QTimer
-from PyQt5.QtGui import QIcon
-
-def convert_png_to_ints(file_path):
-    try:
-        with open(file_path, 'rb') as file:
-            byte_data = file.read()
-        return list(byte_data)
-    except Exception as e:
-        raise RuntimeError(f"Error converting PNG to ints: {e}")
-
-def write_ints_to_file(ints, image_name, output_filepath):
-    try:
-        with open(output_filepath, 'w', encoding='utf-8') as file:
-            file.write(image_name + '\n')
-            for num in ints:
-                file.write(str(num) + '\n')
-            file.write('~\n')
-    except Exception as e:
-        raise RuntimeError(f"Error writing ints to file: {e}")
-
-def read_project_file(file_path):
-    try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return file.readlines()
-    except Exception as e:
-        raise RuntimeError(f"Error reading project file: {e}")
-
-def read_map_cubes(map_data_path):
-    map_cubes = []
-    try:
-        for filename in os.listdir(map_data_path):
-            if filename.endswith(".mapCube"):
-                file_path = os.path.join(map_data_path, filename)
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    map_cubes.append(file.readlines())
-    except Exception as e:
-        raise RuntimeError(f"Error reading map cubes: {e}")
-    return map_cubes
-
-def convert_jpg_to_png(jpg_path, png_path):
-    try:
-        with Image.open(jpg_path) as img:
-            img.save(png_path, 'PNG')
-        return True
-    except Exception as e:
-        raise RuntimeError(f"Error converting JPG to PNG: {e}")
-
-def read_custom_textures(custom_textures_path):
-    custom_textures = []
-    try:
-        for filename in os.listdir(custom_textures_path):
-            if filename.endswith(".png"):
-                file_path = os.path.join(custom_textures_path, filename)
-                integer_data = convert_png_to_ints(file_path)
-                image_name = os.path.splitext(filename)[0]
-                custom_textures.append((image_name, integer_data))
-            elif filename.endswith(".jpg"):
-                jpg_path = os.path.join(custom_textures_path, filename)
-                png_path = os.path.join(custom_textures_path, os.path.splitext(filename)[0] + ".png")
-                if convert_jpg_to_png(jpg_path, png_path):
-                    integer_data = convert_png_to_ints(png_path)
-                    image_name = os.path.splitext(filename)[0]
-                    custom_textures.append((image_name, integer_data))
-    except Exception as e:
-        raise RuntimeError(f"Error reading custom textures: {e}")
-    return custom_textures
-
-def create_gbmap_file(output_file_path, relevant_section, gbmap_ICON, gbmap_BANNER, gbmap_CUSTOMTEXTURES, mapCube_data, update_advanced_console, update_progress, update_action, map_name, map_description):
-    try:
-        with open(output_file_path, 'w', encoding='utf-8') as file:
-            update_action.emit("Writing version to file")
-            file.write("V2\n")
-
-            update_action.emit("Writing relevant section to file")
-            file.write((map_name or relevant_section[1]).strip() + '\n')
-            file.write((map_description or relevant_section[2]).strip() + '\n')
-
-            update_action.emit("Writing section delimiter")
-            file.write("§\n")
-
-            update_action.emit("Writing map cube and custom texture counts")
-            file.write(f"{len(mapCube_data)}\n{len(gbmap_CUSTOMTEXTURES)}\n")
-
-            update_action.emit("Writing remaining relevant section to file")
-            file.writelines(line.strip() + '\n' for line in relevant_section[3:])
-
-            update_action.emit("Writing section delimiter")
-            file.write("§\n")
-
-            update_action.emit("Writing icon data to file")
-            file.writelines([str(num) + '\n' for num in gbmap_ICON])
-
-            update_action.emit("Writing section delimiter")
-            file.write("§\n")
-
-            update_action.emit("Writing banner data to file")
-            file.writelines([str(num) + '\n' for num in gbmap_BANNER])
-
-            update_action.emit("Writing section delimiter")
-            file.write("§\n")
-
-            for idx, (image_name, integer_data) in enumerate(gbmap_CUSTOMTEXTURES):
-                update_action.emit(f"Writing custom texture: {image_name}")
-                file.write(image_name + '\n')
-                for num in integer_data:
-                    file.write(str(num) + '\n')
-                file.write('~\n')
-                update_progress.emit(int((idx + 1) / len(gbmap_CUSTOMTEXTURES) * 30))
-
-            update_action.emit("Writing section delimiter")
-            file.write("§\n")
-
-            for idx, cube_data in enumerate(mapCube_data):
-                update_action.emit(f"Writing map cube data {idx + 1}/{len(mapCube_data)}")
-                file.writelines(cube_data)
-                update_progress.emit(30 + int((idx + 1) / len(mapCube_data) * 70))
-                time.sleep(0.01)
-
-            update_action.emit("Writing final section delimiter")
-            file.write("§\n")
-    except Exception as e:
-        update_advanced_console.emit(f"{QDateTime.currentDateTime().toString('yyyy-MM-dd hh:mm:ss')} Error creating gbmap file: {e}")
-        raise RuntimeError(f"Error creating gbmap file: {e}")
-
-class ScriptThread(QThread):
-    update_basic_console = pyqtSignal(str)
-    update_advanced_console = pyqtSignal(str)
-    update_progress = pyqtSignal(int)
-    update_action = pyqtSignal(str)
-    finished = pyqtSignal()
-
-    def __init__(self, folder_path, output_file_path, map_name, map_description):
-        super().__init__()
-        self.folder_path = folder_path
-        self.output_file_path = output_file_path
-        self.map_name = map_name
-        self.map_description = map_description
-        self.running = True
-
-    def run(self):
-        try:
-            self.update_basic_console.emit("Initializing script execution...")
-            self.update_advanced_console.emit(f"{QDateTime.currentDateTime().toString('yyyy-MM-dd hh:mm:ss')} Initializing script execution...")
-
-            map_data_path = os.path.join(self.folder_path, "MapData")
-            custom_textures_path = os.path.join(self.folder_path, "CustomTextures")
-            project_file_path = os.path.join(self.folder_path, "projectFile.gbi")
-            icon_file_path = os.path.join(self.folder_path, "icon.png")
-            banner_file_path = os.path.join(self.folder_path, "banner.png")
-
-            self.update_advanced_console.emit(f"{QDateTime.currentDateTime().toString('yyyy-MM-dd hh:mm:ss')} Validating required files and folders...")
-            if not (os.path.exists(map_data_path) and os.path.exists(custom_textures_path) and os.path.exists(project_file_path) and os.path.exists(icon_file_path) and os.path.exists(banner_file_path)):
-                self.update_basic_console.emit("Critical files or folders are missing.")
-                self.update_advanced_console.emit(f"{QDateTime.currentDateTime().toString('yyyy-MM-dd hh:mm:ss')} Critical files or folders are missing.")
-                self.finished.emit()
-                return
-
-            self.update_basic_console.emit("Gathering project metadata...")
-            self.update_advanced_console.emit(f"{QDateTime.currentDateTime().toString('yyyy-MM-dd hh:mm:ss')} Reading project file: {project_file_path}")
-            relevant_section = read_project_file(project_file_path)
-
-            self.update_basic_console.emit("Processing icon data...")
-            self.update_advanced_console.emit(f"{QDateTime.currentDateTime().toString('yyyy-MM-dd hh:mm:ss')} Converting icon to ints: {icon_file_path}")
-            gbmap_ICON = convert_png_to_ints(icon_file_path)
-
-            self.update_basic_console.emit("Processing banner data...")
-            self.update_advanced_console.emit(f"{QDateTime.currentDateTime().toString('yyyy-MM-dd hh:mm:ss')} Converting banner to ints: {banner_file_path}")
-            gbmap_BANNER = convert_png_to_ints(banner_file_path)
-
-            self.update_basic_console.emit("Gathering custom texture data...")
-            self.update_advanced_console.emit(f"{QDateTime.currentDateTime().toString('yyyy-MM-dd hh:mm:ss')} Reading custom textures: {custom_textures_path}")
-            gbmap_CUSTOMTEXTURES = read_custom_textures(custom_textures_path)
-
-            self.update_basic_console.emit("Gathering map cube data...")
-            self.update_advanced_console.emit(f"{QDateTime.currentDateTime().toString('yyyy-MM-dd hh:mm:ss')} Reading map cubes: {map_data_path}")
-            mapCube_data = read_map_cubes(map_data_path)
-
-            self.update_basic_console.emit("Compiling gbmap file...")
-            self.update_advanced_console.emit(f"{QDateTime.currentDateTime().toString('yyyy-MM-dd hh:mm:ss')} Creating gbmap file: {self.output_file_path}")
-            create_gbmap_file(self.output_file_path, relevant_section, gbmap_ICON, gbmap_BANNER, gbmap_CUSTOMTEXTURES, mapCube_data, self.update_advanced_console, self.update_progress, self.update_action, self.map_name, self.map_description)
-
-            self.update_basic_console.emit("Map file creation successful!")
-            self.update_advanced_console.emit(f"{QDateTime.currentDateTime().toString('yyyy-MM-dd hh:mm:ss')} Map file creation successful!")
-        except Exception as e:
-            self.update_basic_console.emit(f"Error encountered: {e}")
-            self.update_advanced_console.emit(f"{QDateTime.currentDateTime().toString('yyyy-MM-dd hh:mm:ss')} Error encountered: {e}")
-            traceback.print_exc()
-        self.finished.emit()
-
-    def stop(self):
-        self.running = False
-        self.terminate()
-
-class MapCreatorApp(QWidget):
-    def __init__(self):
-        super().__init__()
-        self.initUI()
-
-    def initUI(self):
-        self.setWindowTitle('GoreBox Map Exporter')
-        self.setGeometry(100, 100, 800, 600)  # Increased the height to accommodate the custom textures list
-        self.layout = QVBoxLayout()
-
-        self.tab_widget = QTabWidget()
-        self.tab_widget.setDocumentMode(True)
-        self.tab_widget.tabBar().setShape(QTabBar.RoundedNorth)
-
-        self.import_tab = QWidget()
-        self.import_layout = QVBoxLayout()
-
-        self.import_scroll_area = QScrollArea()
-        self.import_scroll_area.setWidgetResizable(True)
-        self.import_scroll_content = QWidget()
-        self.import_scroll_layout = QGridLayout()
-
-        self.import_scroll_content.setLayout(self.import_scroll_layout)
-        self.import_scroll_area.setWidget(self.import_scroll_content)
-        self.import_layout.addWidget(self.import_scroll_area)
-
-        self.refresh_button = QPushButton('Refresh')
-        self.refresh_button.clicked.connect(self.refresh_import_list)
-        self.import_layout.addWidget(self.refresh_button, alignment=Qt.AlignLeft)
-
-        self.import_tab.setLayout(self.import_layout)
-        self.tab_widget.addTab(self.import_tab, "Import")
-
-        self.export_tab = QWidget()
-        self.export_layout = QVBoxLayout()
-
-        self.folder_label = QLabel('Folder path')
-        self.export_layout.addWidget(self.folder_label)
-        self.folder_button = QPushButton('Browse')
-        self.folder_button.clicked.connect(self.browse_folder)
-        self.export_layout.addWidget(self.folder_button)
-
-        self.output_label = QLabel('Output file')
-        self.export_layout.addWidget(self.output_label)
-        self.output_button = QPushButton('Browse')
-        self.output_button.clicked.connect(self.browse_output_file)
-        self.export_layout.addWidget(self.output_button)
-
-        self.console_layout = QHBoxLayout()
-
-        self.basic_console_layout = QVBoxLayout()
-        self.basic_console_label = QLabel('Basic Console')
-        self.basic_console_label.setAlignment(Qt.AlignCenter)
-        self.basic_console_layout.addWidget(self.basic_console_label)
-        self.basic_console = QTextEdit()
-        self.basic_console.setReadOnly(True)
-        self.basic_console_layout.addWidget(self.basic_console)
-        self.console_layout.addLayout(self.basic_console_layout)
-
-        self.advanced_console_layout = QVBoxLayout()
-        self.advanced_console_label = QLabel('Advanced Console')
-        self.advanced_console_label.setAlignment(Qt.AlignCenter)
-        self.advanced_console_layout.addWidget(self.advanced_console_label)
-        self.advanced_console = QTextEdit()
-        self.advanced_console.setReadOnly(True)
-        self.advanced_console_layout.addWidget(self.advanced_console)
-        self.console_layout.addLayout(self.advanced_console_layout)
-
-        self.export_layout.addLayout(self.console_layout)
-
-        self.progress_layout = QHBoxLayout()
-        self.progress_label = QLabel('Press Start To Export')
-        self.progress_label.setAlignment(Qt.AlignCenter)
-        self.progress_layout.addWidget(self.progress_label)
-        self.progress_bar = QProgressBar()
-        self.progress_bar.setRange(0, 100)
-        self.progress_bar.setValue(0)
-        self.progress_layout.addWidget(self.progress_bar)
-        self.export_layout.addLayout(self.progress_layout)
-
-        self.start_button = QPushButton('Start')
-        self.start_button.clicked.connect(self.start_script)
-        self.export_layout.addWidget(self.start_button)
-
-        self.export_tab.setLayout(self.export_layout)
-        self.tab_widget.addTab(self.export_tab, "Export")
-
-        self.basic_info_tab = QWidget()
-        self.basic_info_layout = QVBoxLayout()
-        self.basic_info_layout.setSpacing(5)
-        self.basic_info_layout.setContentsMargins(5, 5, 5, 5)
-
-        self.map_name_label = QLabel('Map Name')
-        self.basic_info_layout.addWidget(self.map_name_label)
-        self.map_name_input = QLineEdit()
-        self.map_name_input.setPlaceholderText('Leave empty for original name')
-        self.basic_info_layout.addWidget(self.map_name_input)
-
-        self.map_description_label = QLabel('Map Description')
-        self.basic_info_layout.addWidget(self.map_description_label)
-        self.map_description_input = QLineEdit()
-        self.map_description_input.setPlaceholderText('Leave empty for original description')
-        self.basic_info_layout.addWidget(self.map_description_input)
-
-        self.custom_textures_label = QLabel('No Map Project Chosen')
-        self.custom_textures_label.setAlignment(Qt.AlignCenter)
-        self.basic_info_layout.addWidget(self.custom_textures_label)
-
-        self.custom_textures_scroll_area = QScrollArea()
-        self.custom_textures_scroll_area.setWidgetResizable(True)
-        self.custom_textures_scroll_area.setMinimumHeight(450)  # Increased the minimum height
-        self.custom_textures_scroll_content = QWidget()
-        self.custom_textures_scroll_layout = QGridLayout()
-
-        self.custom_textures_scroll_content.setLayout(self.custom_textures_scroll_layout)
-        self.custom_textures_scroll_area.setWidget(self.custom_textures_scroll_content)
-        self.basic_info_layout.addWidget(self.custom_textures_scroll_area)
-
-        # Add a spacer to create some space between the scroll area and the buttons
-        self.basic_info_layout.addSpacing(10)
-
-        # Add buttons for changing and reverting textures
-        self.button_layout = QHBoxLayout()
-        self.button_layout.setContentsMargins(0, 0, 0, 0)  # Remove any margins
-        self.button_layout.setSpacing(2)  # Set a very small spacing between the buttons
-
-        self.change_texture_button = QPushButton('Change Texture')
-        self.change_texture_button.clicked.connect(self.change_texture)
-        self.button_layout.addWidget(self.change_texture_button)
-
-        self.revert_texture_button = QPushButton('Revert Texture')
-        self.revert_texture_button.clicked.connect(self.revert_texture)
-        self.button_layout.addWidget(self.revert_texture_button)
-
-        self.basic_info_layout.addLayout(self.button_layout)
-
-        # Add label to display the selected texture's name
-        self.selected_texture_label = QLabel('')
-        self.selected_texture_label.setAlignment(Qt.AlignRight | Qt.AlignBottom)
-        self.basic_info_layout.addWidget(self.selected_texture_label)
-
-        self.basic_info_layout.addStretch(1)
-
-        self.basic_info_tab.setLayout(self.basic_info_layout)
-        self.tab_widget.addTab(self.basic_info_tab, "Basic Info")
-
-        self.layout.addWidget(self.tab_widget)
-        self.setLayout(self.layout)
-
-        self.folder_path = None
-        self.output_file_path = os.path.join(os.path.expanduser("~"), "AppData", "LocalLow", "F2Games", "GoreBox", "Maps", "CustomMap.gbmap")
-        self.output_label.setText(f'Output file: {self.output_file_path}')
-
-        self.original_textures = {}
-        self.changed_textures = {}
-
-        self.refresh_import_list()
-        self.refresh_custom_textures_list()
-
-    def browse_folder(self):
-        # Revert all images before changing the map project path
-        self.revert_all_textures()
-
-        options = QFileDialog.Options()
-        folder_path = QFileDialog.getExistingDirectory(self, "Select Folder", options=options)
-        if folder_path:
-            self.folder_path = folder_path
-            self.folder_label.setText(f'Folder path: {folder_path}')
-            self.refresh_custom_textures_list()
-
-    def browse_output_file(self):
-        options = QFileDialog.Options()
-        default_file_name = "CustomMap.gbmap"
-        default_dir = os.path.join(os.path.expanduser("~"), "AppData", "LocalLow", "F2Games", "GoreBox", "Maps")
-        file_path, _ = QFileDialog.getSaveFileName(self, "Save Output File", os.path.join(default_dir, default_file_name), "GBMAP Files (*.gbmap)", options=options)
-        if file_path:
-            self.output_file_path = file_path
-            self.output_label.setText(f'Output file: {file_path}')
-
-    def start_script(self):
-        if not self.folder_path or not self.output_file_path:
-            QMessageBox.warning(self, "Warning", "Please select both the folder and the output file.")
-            return
-        self.basic_console.clear()
-        self.advanced_console.clear()
-        self.progress_label.setText('Starting Export')
-        self.progress_bar.setValue(0)
-        self.folder_button.setEnabled(False)
-        self.output_button.setEnabled(False)
-        self.start_button.setEnabled(False)
-        self.map_name_input.setEnabled(False)
-        self.map_description_input.setEnabled(False)
-        self.start_button.setText('Exporting Map...')
-        self.start_button.clicked.disconnect()
-        self.start_button.clicked.connect(self.cancel_script)
-
-        map_name = self.map_name_input.text().strip() if self.map_name_input.text().strip() else None
-        map_description = self.map_description_input.text().strip() if self.map_description_input.text().strip() else None
-
-        self.script_thread = ScriptThread(self.folder_path, self.output_file_path, map_name, map_description)
-        self.script_thread.update_basic_console.connect(self.update_basic_console)
-        self.script_thread.update_advanced_console.connect(self.update_advanced_console)
-        self.script_thread.update_progress.connect(self.update_progress)
-        self.script_thread.update_action.connect(self.update_action)
-        self.script_thread.finished.connect(self.script_finished)
-        self.script_thread.start()
-
-    def cancel_script(self):
-        self.script_thread.stop()
-        self.script_finished()
-
-    def update_basic_console(self, message):
-        self.basic_console.append(message)
-        QApplication.processEvents()
-
-    def update_advanced_console(self, message):
-        self.advanced_console.append(message)
-        QApplication.processEvents()
-
-    def update_progress(self, value):
-        self.progress_bar.setValue(value)
-        QApplication.processEvents()
-
-    def update_action(self, message):
-        self.progress_label.setText(f'{message}')
-        QApplication.processEvents()
-
-    def script_finished(self):
-        self.folder_button.setEnabled(True)
-        self.output_button.setEnabled(True)
-        self.start_button.setEnabled(True)
-        self.map_name_input.setEnabled(True)
-        self.map_description_input.setEnabled(True)
-        self.start_button.setText('Start')
-        self.start_button.clicked.disconnect()
-        self.start_button.clicked.connect(self.start_script)
-        self.progress_label.setText('Press Start To Export')
-        self.progress_bar.setValue(0)
-        QMessageBox.information(self, "Success", "Map file created successfully!")
-
-    def refresh_import_list(self):
-        user_home = os.path.expanduser("~")
-        map_projects_dir = os.path.join(user_home, "AppData", "LocalLow", "F2Games", "GoreBox", "MapProjects")
-        if not os.path.exists(map_projects_dir):
-            QMessageBox.warning(self, "Warning", "MapProjects directory does not exist.")
-            return
-
-        folders = [f for f in os.listdir(map_projects_dir) if os.path.isdir(os.path.join(map_projects_dir, f))]
-
-        for i in reversed(range(self.import_scroll_layout.count())):
-            widget = self.import_scroll_layout.itemAt(i).widget()
-            if widget is not None:
-                widget.setParent(None)
-
-        for idx, folder in enumerate(folders):
-            folder_path = os.path.join(map_projects_dir, folder)
-            project_file_path = os.path.join(folder_path, "projectFile.gbi")
-            icon_path = os.path.join(folder_path, "icon.png")
-
-            if os.path.exists(project_file_path) and os.path.exists(icon_path):
-                with open(project_file_path, 'r', encoding='utf-8') as file:
-                    lines = file.readlines()
-                    label_text = lines[1].strip() if len(lines) > 1 else folder
-
-                button = QPushButton()
-                button.setFixedSize(80, 80)
-                button.setStyleSheet("background-color: lightgray; border: 1px solid gray;")
-
-                icon = QIcon(icon_path)
-                button.setIcon(icon)
-                button.setIconSize(button.size())
-
-                button.clicked.connect(lambda checked, path=folder_path: self.on_folder_button_clicked(path))
-
-                self.import_scroll_layout.addWidget(button, idx // 5 * 2, idx % 5)
-
-                label = QLabel(label_text)
-                label.setAlignment(Qt.AlignCenter)
-                label.setWordWrap(True)
-                self.import_scroll_layout.addWidget(label, idx // 5 * 2 + 1, idx % 5)
-
-    def on_folder_button_clicked(self, folder_path):
-        if self.is_valid_map_project(folder_path):
-            self.folder_path = folder_path
-            self.folder_label.setText(f'Folder path: {folder_path}')
-            self.tab_widget.setCurrentWidget(self.export_tab)
-            self.refresh_custom_textures_list()
-        else:
-            QMessageBox.warning(self, "Warning", "The selected folder is not a valid map project.")
-
-    def refresh_custom_textures_list(self):
-        if not self.folder_path or not self.is_valid_map_project(self.folder_path):
-            self.custom_textures_label.setText('No Map Project Chosen')
-            for i in reversed(range(self.custom_textures_scroll_layout.count())):
-                widget = self.custom_textures_scroll_layout.itemAt(i).widget()
-                if widget is not None:
-                    widget.setParent(None)
-            return
-
-        self.custom_textures_label.setText('Custom Textures')
-        custom_textures_path = os.path.join(self.folder_path, "CustomTextures")
-
-        if not os.path.exists(custom_textures_path):
-            QMessageBox.warning(self, "Warning", "CustomTextures directory does not exist.")
-            return
-
-        textures = [f for f in os.listdir(custom_textures_path) if f.endswith(('.png', '.jpg'))]
-
-        for i in reversed(range(self.custom_textures_scroll_layout.count())):
-            widget = self.custom_textures_scroll_layout.itemAt(i).widget()
-            if widget is not None:
-                widget.setParent(None)
-
-        def add_texture_button(idx, texture, texture_path):
-            button = QPushButton()
-            button.setFixedSize(80, 80)
-            button.setStyleSheet("background-color: lightgray; border: 1px solid gray;")
-            button.setProperty('texture_path', texture_path)  # Store the texture path in the button's property
-
-            icon = QIcon(texture_path)
-            button.setIcon(icon)
-            button.setIconSize(button.size())
-
-            button.clicked.connect(lambda checked, btn=button: self.select_texture_button(btn))
-
-            self.custom_textures_scroll_layout.addWidget(button, idx // 5 * 2, idx % 5)
-
-            label = QLabel(texture)
-            label.setAlignment(Qt.AlignCenter)
-            label.setWordWrap(True)
-            self.custom_textures_scroll_layout.addWidget(label, idx // 5 * 2 + 1, idx % 5)
-
-        for idx, texture in enumerate(textures):
-            texture_path = os.path.join(custom_textures_path, texture)
-            QTimer.singleShot(idx * 50, lambda idx=idx, texture=texture, texture_path=texture_path: add_texture_button(idx, texture, texture_path))
-
-    def select_texture_button(self, button):
-        self.selected_texture_button = button
-        texture_path = button.property('texture_path')
-        texture_name = os.path.basename(texture_path)
-        self.selected_texture_label.setText(texture_name)
-
-    def change_texture(self):
-        if self.selected_texture_button is None:
-            QMessageBox.warning(self, "Warning", "Please select a texture to change.")
-            return
-
-        options = QFileDialog.Options()
-        file_path, _ = QFileDialog.getOpenFileName(self, "Select New Texture", "", "Images (*.png *.jpg)", options=options)
-        if file_path:
-            # Get the original texture path
-            original_texture_path = self.selected_texture_button.property('texture_path')
-            if original_texture_path:
-                # Backup the original texture
-                if original_texture_path not in self.original_textures:
-                    self.original_textures[original_texture_path] = os.path.join(os.path.dirname(original_texture_path), f"original_{os.path.basename(original_texture_path)}")
-                    shutil.copyfile(original_texture_path, self.original_textures[original_texture_path])
-
-                # Replace the texture while keeping the original name
-                shutil.copyfile(file_path, original_texture_path)
-                # Store the changed texture path
-                self.changed_textures[original_texture_path] = file_path
-                # Refresh the button's image
-                icon = QIcon(original_texture_path)
-                self.selected_texture_button.setIcon(icon)
-                self.selected_texture_button.setIconSize(self.selected_texture_button.size())
-
-    def revert_texture(self):
-        if self.selected_texture_button is None:
-            QMessageBox.warning(self, "Warning", "Please select a texture to revert.")
-            return
-
-        original_texture_path = self.selected_texture_button.property('texture_path')
-        if original_texture_path in self.original_textures:
-            # Revert to the original texture
-            shutil.copyfile(self.original_textures[original_texture_path], original_texture_path)
-            # Refresh the button's image
-            icon = QIcon(original_texture_path)
-            self.selected_texture_button.setIcon(icon)
-            self.selected_texture_button.setIconSize(self.selected_texture_button.size())
-            # Remove the changed texture path from the dictionary
-            if original_texture_path in self.changed_textures:
-                del self.changed_textures[original_texture_path]
-
-    def revert_all_textures(self):
-        # Revert all images to their original state
-        for original_path in self.original_textures.values():
-            if os.path.exists(original_path):
-                original_texture_path = list(self.original_textures.keys())[list(self.original_textures.values()).index(original_path)]
-                shutil.copyfile(original_path, original_texture_path)
-        # Clear the changed textures dictionary
-        self.changed_textures.clear()
-
-    def is_valid_map_project(self, folder_path):
-        required_files = ["projectFile.gbi", "icon.png", "banner.png"]
-        required_folders = ["MapData", "CustomTextures"]
-
-        for file in required_files:
-            if not os.path.exists(os.path.join(folder_path, file)):
-                return False
-
-        for folder in required_folders:
-            if not os.path.exists(os.path.join(folder_path, folder)):
-                return False
-
-        return True
-
-    def closeEvent(self, event):
-        # Revert all images to their original state
-        self.revert_all_textures()
-        # Clean up temporary files
-        for original_path in self.original_textures.values():
-            if os.path.exists(original_path):
-                os.remove(original_path)
-        event.accept()
-
-if __name__ == '__main__':
-    try:
-        app = QApplication(sys.argv)
-        ex = MapCreatorApp()
-        ex.show()
-        sys.exit(app.exec_())
-    except Exception as e:
-        print(f"Error: {e}")
-        traceback.print_exc()
+import os
+import sys
+import json
+import argparse
+import traceback
+
+def run_gui(args):
+    # PyQt5 is only imported when the GUI is actually launched
+    from MapExporterGUI import main as gui_main
+    return gui_main()
+
+def open_texture_cache(args):
+    if args.no_cache:
+        return None
+    from TextureCache import TextureCache
+    return TextureCache(args.cache_dir, args.cache_size * 1024 * 1024)
+
+def texture_override(value):
+    name, separator, path = value.partition('=')
+    if not separator or not name or not path:
+        raise argparse.ArgumentTypeError(f"expected NAME=PATH, got {value!r}")
+    return name, path
+
+def run_export(args):
+    from MapEngine import export_project, default_output_file_path
+    from ExportTrace import ExportTrace, profiled
+
+    def progress(kind, value):
+        if kind == 'basic' or (kind == 'advanced' and args.verbose):
+            print(value)
+
+    def export(incremental, changed_paths=None):
+        with ExportTrace(args.trace) as trace, profiled(args.profile, args.trace_memory) as profile_summary:
+            export_project(args.folder, args.output or default_output_file_path(), args.name, args.description, progress, jobs=args.jobs, cache=cache, incremental=incremental, cube_passthrough=args.cube_passthrough, optimize=args.optimize or args.max_texture_size is not None, max_texture_size=args.max_texture_size, texture_overrides=dict(args.override_texture or []), trace=trace, compression=args.compress, compression_level=args.compress_level, compression_threads=args.compress_threads, validate=not args.no_validate, changed_paths=changed_paths)
+        for line in profile_summary:
+            print(line)
+
+    cache = open_texture_cache(args)
+    try:
+        if not args.watch:
+            export(args.incremental)
+            return 0
+        watch_exports(args, export)
+    except KeyboardInterrupt:
+        if args.watch:
+            print("Stopped watching.")
+            return 0
+        print("Export cancelled, previous map left untouched.", file=sys.stderr)
+        return 130
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        if args.verbose:
+            traceback.print_exc()
+        return 1
+    finally:
+        if cache is not None:
+            cache.close()
+    return 0
+
+def watch_exports(args, export):
+    """Export, then re-export incrementally after every burst of changes until interrupted."""
+    from ProjectWatcher import watch_project
+
+    validated = False
+
+    def export_and_report(changed_paths=None):
+        nonlocal validated
+        try:
+            # Once an export has passed validation only changed inputs are re-checked
+            export(True, changed_paths if validated else None)
+            validated = True
+        except Exception as e:
+            validated = False
+            # Keep watching: the next save may well fix it
+            print(f"Error: {e}", file=sys.stderr)
+            if args.verbose:
+                traceback.print_exc()
+
+    def on_change(changed):
+        print(f"{len(changed)} file(s) changed: {', '.join(os.path.relpath(path, args.folder) for path in changed[:5])}{', ...' if len(changed) > 5 else ''}")
+        export_and_report(changed)
+
+    export_and_report()
+    print(f"Watching {args.folder} for changes, press Ctrl+C to stop.")
+    watch_project(args.folder, on_change)
+
+def run_batch(args):
+    from BatchExport import batch_export
+
+    def progress(kind, value):
+        if kind == 'basic' or (kind == 'advanced' and args.verbose):
+            print(value)
+
+    try:
+        results = batch_export(args.projects, args.output_dir, args.jobs, args.force, progress, not args.no_cache, args.cache_dir, args.cache_size * 1024 * 1024)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        if args.verbose:
+            traceback.print_exc()
+        return 1
+    return 1 if any(result['status'] == 'failed' for result in results) else 0
+
+def run_info(args):
+    from MapReader import GbmapReader
+    try:
+        with GbmapReader(args.map) as reader:
+            print(reader.summary())
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+def run_unpack(args):
+    from MapReader import GbmapReader
+    from ExportIndex import ExportIndex
+    try:
+        with GbmapReader(args.map) as reader:
+            if args.texture is not None:
+                with open(args.output, 'wb') as file:
+                    file.write(reader.read_texture(args.texture))
+                return 0
+            reader.unpack(args.output, ExportIndex.load(args.map))
+            print(f"Unpacked {reader.texture_count} textures and {reader.cube_count} map cubes into {args.output}")
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+def run_validate(args):
+    from ProjectValidator import validate_project
+    result = validate_project(args.folder, args.jobs, full=args.full)
+    for error in result['errors']:
+        print(f"Error: {error}")
+    for warning in result['warnings']:
+        print(f"Warning: {warning}")
+    if result['estimated_size'] is not None:
+        print(f"{result['textures']} textures, {result['cubes']} map cubes; estimated output {result['estimated_size'] / 1e6:.1f} MB in about {result['estimated_seconds']:.0f}s")
+    print(f"{len(result['errors'])} error(s), {len(result['warnings'])} warning(s)")
+    return 1 if result['errors'] else 0
+
+def run_decompress(args):
+    from MapCompression import decompress_map
+    try:
+        output_file_path = decompress_map(args.map, args.output)
+        print(f"Decompressed {args.map} to {output_file_path}")
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+def run_daemon(args):
+    from ExportDaemon import serve
+    serve(args.host, args.port, args.workers, args.jobs, not args.no_cache, args.cache_dir, args.cache_size * 1024 * 1024, args.verbose)
+    return 0
+
+def run_submit(args):
+    from ExportDaemon import call, wait_for_job
+    try:
+        reply = call('POST', '/jobs', {'folder': os.path.abspath(args.folder), 'output': os.path.abspath(args.output) if args.output else None, 'name': args.name, 'description': args.description, 'priority': args.priority}, args.host, args.port)
+        print(f"Job {reply['id']}{' (already queued)' if reply['deduplicated'] else ''}")
+        if not args.wait:
+            return 0
+        job = wait_for_job(reply['id'], args.host, args.port)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"Job {job['id']} {job['status']}: waited {job['wait_seconds']:.2f}s, ran {job['run_seconds']:.2f}s{' - ' + job['error'] if job['error'] else ''}")
+    return 0 if job['status'] == 'done' else 1
+
+def run_jobs(args):
+    from ExportDaemon import call
+    try:
+        if args.cancel is not None:
+            job = call('DELETE', f"/jobs/{args.cancel}", host=args.host, port=args.port)
+            print(f"Job {job['id']}: {job['status']}")
+            return 0
+        if args.job is not None:
+            print(json.dumps(call('GET', f"/jobs/{args.job}", host=args.host, port=args.port), indent=2))
+            return 0
+        for job in call('GET', '/jobs', host=args.host, port=args.port):
+            timing = f" waited {job['wait_seconds']:.2f}s" if job['wait_seconds'] is not None else ""
+            timing += f" ran {job['run_seconds']:.2f}s" if job['run_seconds'] is not None else ""
+            print(f"{job['id']:>5} {job['status']:<9} p{job['priority']} {os.path.basename(job['folder'])} -> {job['output']}{timing}{' ' + job['error'] if job['error'] else ''}")
+        stats = call('GET', '/stats', host=args.host, port=args.port)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    hit_rate = f"{stats['cache_hit_rate']:.0%}" if stats['cache_hit_rate'] is not None else "n/a"
+    print(f"{stats['workers']} workers; {', '.join(f'{count} {status}' for status, count in stats['statuses'].items())}; texture cache {stats['cache_hits']} hits, {stats['cache_misses']} misses ({hit_rate})")
+    return 0
+
+def add_daemon_address_arguments(parser):
+    from ExportDaemon import DEFAULT_HOST, DEFAULT_PORT
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'daemon address (default: {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'daemon port (default: {DEFAULT_PORT})')
+
+def add_cache_arguments(parser):
+    parser.add_argument('--cache-dir', help='encoded texture cache directory')
+    parser.add_argument('--cache-size', type=int, default=2048, help='texture cache size cap in MB (default: 2048)')
+    parser.add_argument('--no-cache', action='store_true', help='do not use the encoded texture cache')
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='MapExporter.py', description='GoreBox Map Exporter')
+    subparsers = parser.add_subparsers(dest='command')
+
+    gui_parser = subparsers.add_parser('gui', help='launch the GUI (default)')
+    gui_parser.set_defaults(func=run_gui)
+
+    export_parser = subparsers.add_parser('export', help='export a map project to a .gbmap file')
+    export_parser.add_argument('folder', help='map project folder')
+    export_parser.add_argument('-o', '--output', help='output .gbmap file (default: GoreBox Maps/CustomMap.gbmap)')
+    export_parser.add_argument('--name', help='override the map name')
+    export_parser.add_argument('--description', help='override the map description')
+    export_parser.add_argument('-j', '--jobs', type=int, help='texture encoding workers (default: CPU count)')
+    export_parser.add_argument('-i', '--incremental', action='store_true', help='only rebuild records whose inputs changed since the last export')
+    export_parser.add_argument('--cube-passthrough', action='store_true', help='copy map cubes verbatim, without newline translation')
+    export_parser.add_argument('-O', '--optimize', action='store_true', help='losslessly recompress textures and encode duplicates once (needs PIL)')
+    export_parser.add_argument('--max-texture-size', type=int, help='downsize textures larger than this many pixels (implies --optimize)')
+    export_parser.add_argument('--override-texture', action='append', type=texture_override, metavar='NAME=PATH', help='export PATH in place of the custom texture NAME, without modifying the project (repeatable)')
+    export_parser.add_argument('--compress', choices=['gzip', 'zstd'], help='also write a compressed copy (.gz or .zst) for distribution; zstd needs the zstandard package')
+    export_parser.add_argument('--compress-level', type=int, help='compression level (default: 6 for gzip, 3 for zstd)')
+    export_parser.add_argument('--compress-threads', type=int, help='compression threads (default: --jobs)')
+    export_parser.add_argument('-w', '--watch', action='store_true', help='keep running and re-export incrementally whenever the project changes')
+    export_parser.add_argument('--no-validate', action='store_true', help='skip the pre-export check of every input')
+    export_parser.add_argument('-v', '--verbose', action='store_true', help='print advanced console messages')
+    export_parser.add_argument('--trace', metavar='FILE', help='write per-stage and per-record timings as JSON lines')
+    export_parser.add_argument('--profile', metavar='FILE', help='run under cProfile and dump the stats to FILE')
+    export_parser.add_argument('--trace-memory', action='store_true', help='report Python allocations with tracemalloc')
+    add_cache_arguments(export_parser)
+    export_parser.set_defaults(func=run_export)
+
+    batch_parser = subparsers.add_parser('batch', help='export every map project under MapProjects')
+    batch_parser.add_argument('--projects', help='MapProjects folder (default: GoreBox MapProjects)')
+    batch_parser.add_argument('--output-dir', help='folder for the .gbmap files (default: GoreBox Maps)')
+    batch_parser.add_argument('-j', '--jobs', type=int, help='projects exported in parallel (default: CPU count)')
+    batch_parser.add_argument('-f', '--force', action='store_true', help='re-export projects even if their inputs are unchanged')
+    batch_parser.add_argument('-v', '--verbose', action='store_true', help='print advanced console messages')
+    add_cache_arguments(batch_parser)
+    batch_parser.set_defaults(func=run_batch)
+
+    info_parser = subparsers.add_parser('info', help='show the sections and textures of a .gbmap file')
+    info_parser.add_argument('map', help='.gbmap file')
+    info_parser.set_defaults(func=run_info)
+
+    unpack_parser = subparsers.add_parser('unpack', help='unpack a .gbmap back into a map project folder')
+    unpack_parser.add_argument('map', help='.gbmap file')
+    unpack_parser.add_argument('output', help='project folder to create (or PNG file with --texture)')
+    unpack_parser.add_argument('--texture', help='only extract the texture with this name')
+    unpack_parser.set_defaults(func=run_unpack)
+
+    validate_parser = subparsers.add_parser('validate', help='check a map project for problems without exporting it')
+    validate_parser.add_argument('folder', help='map project folder')
+    validate_parser.add_argument('-j', '--jobs', type=int, help='parallel checks (default: CPU count)')
+    validate_parser.add_argument('--full', action='store_true', help='decode all of every map cube instead of its start')
+    validate_parser.set_defaults(func=run_validate)
+
+    daemon_parser = subparsers.add_parser('daemon', help='run a local export daemon with a job queue and warm caches')
+    add_daemon_address_arguments(daemon_parser)
+    daemon_parser.add_argument('-w', '--workers', type=int, default=2, help='exports run at once (default: 2)')
+    daemon_parser.add_argument('-j', '--jobs', type=int, help='texture encoding workers, shared by all exports (default: CPU count)')
+    daemon_parser.add_argument('-v', '--verbose', action='store_true', help='log every request')
+    add_cache_arguments(daemon_parser)
+    daemon_parser.set_defaults(func=run_daemon)
+
+    submit_parser = subparsers.add_parser('submit', help='queue an export on a running daemon')
+    submit_parser.add_argument('folder', help='map project folder')
+    submit_parser.add_argument('-o', '--output', help='output .gbmap file (default: GoreBox Maps/<folder>.gbmap)')
+    submit_parser.add_argument('--name', help='override the map name')
+    submit_parser.add_argument('--description', help='override the map description')
+    submit_parser.add_argument('-p', '--priority', type=int, default=0, help='higher runs first (default: 0)')
+    submit_parser.add_argument('--wait', action='store_true', help='wait for the job to finish')
+    add_daemon_address_arguments(submit_parser)
+    submit_parser.set_defaults(func=run_submit)
+
+    jobs_parser = subparsers.add_parser('jobs', help='show the jobs and cache statistics of a running daemon')
+    jobs_parser.add_argument('job', type=int, nargs='?', help='show this job in full')
+    jobs_parser.add_argument('--cancel', type=int, metavar='JOB', help='cancel a queued or running job')
+    add_daemon_address_arguments(jobs_parser)
+    jobs_parser.set_defaults(func=run_jobs)
+
+    decompress_parser = subparsers.add_parser('decompress', help='turn a .gbmap.gz or .gbmap.zst back into a .gbmap')
+    decompress_parser.add_argument('map', help='compressed map')
+    decompress_parser.add_argument('-o', '--output', help='output .gbmap (default: the input without .gz/.zst)')
+    decompress_parser.set_defaults(func=run_decompress)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        return run_gui(args)
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,728 @@
+import os
+import sys
+import traceback
+from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QLabel, QPushButton, QFileDialog, QMessageBox, QPlainTextEdit, QHBoxLayout, QProgressBar, QTabWidget, QLineEdit, QTabBar, QListView, QComboBox, QCheckBox
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QDateTime, QObject, QRunnable, QThreadPool, QAbstractListModel, QModelIndex, QSize, QTimer
+from PyQt5.QtGui import QIcon, QImage, QImageReader, QPixmap
+
+from MapEngine import ExportCancelled, export_project, texture_image_name, app_cache_dir, default_map_projects_dir, default_maps_dir, default_output_file_path, is_valid_map_project
+from ConsoleLog import ConsoleLog, DEFAULT_CAPACITY
+from ThumbnailCache import THUMBNAIL_SIZE, make_thumbnail
+
+class ScriptThread(QThread):
+    success_message = "Map file created successfully!"
+    update_progress = pyqtSignal(int)
+    update_action = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    def __init__(self, folder_path, output_file_path, map_name, map_description, texture_overrides=None, compression=None, changed_paths=None):
+        super().__init__()
+        self.folder_path = folder_path
+        self.output_file_path = output_file_path
+        self.map_name = map_name
+        self.map_description = map_description
+        self.texture_overrides = dict(texture_overrides or {})
+        self.compression = compression
+        self.changed_paths = changed_paths
+        self.running = True
+        self.succeeded = False
+        self.basic_log = None
+        self.advanced_log = None
+
+    def attach_logs(self, basic_log, advanced_log):
+        # Written to straight from this thread; the consoles pick lines up in batches
+        self.basic_log = basic_log
+        self.advanced_log = advanced_log
+
+    def run(self):
+        # Imported on first export, not at startup
+        from TextureCache import TextureCache
+        from ExportTrace import ExportTrace, default_trace_path
+        try:
+            with TextureCache() as cache, ExportTrace(default_trace_path()) as trace:
+                export_project(self.folder_path, self.output_file_path, self.map_name, self.map_description, self.report, cache=cache, incremental=True, cancelled=lambda: not self.running, texture_overrides=self.texture_overrides, trace=trace, compression=self.compression, changed_paths=self.changed_paths)
+            self.succeeded = True
+        except ExportCancelled:
+            self.report('basic', "Export cancelled.")
+            self.report('advanced', f"{QDateTime.currentDateTime().toString('yyyy-MM-dd hh:mm:ss')} Export cancelled, previous map left untouched.")
+        except Exception as e:
+            self.report('basic', f"Error encountered: {e}")
+            self.report('advanced', f"{QDateTime.currentDateTime().toString('yyyy-MM-dd hh:mm:ss')} Error encountered: {e}", 'error')
+            traceback.print_exc()
+        self.finished.emit()
+
+    def report(self, kind, value, level='info'):
+        if kind == 'basic':
+            self.basic_log.log(value, level)
+        elif kind == 'advanced':
+            self.advanced_log.log(value, level)
+        elif kind == 'detail':
+            self.advanced_log.log(value, 'debug')
+        elif kind == 'action':
+            self.update_action.emit(value)
+        elif kind == 'progress':
+            self.update_progress.emit(value)
+
+    def stop(self):
+        # The export polls this between records and cleans up its temp file
+        self.running = False
+
+class BatchThread(ScriptThread):
+    success_message = "Batch export finished, see the consoles for per-project results."
+
+    def __init__(self, map_projects_dir, output_dir):
+        super().__init__(map_projects_dir, output_dir, None, None)
+
+    def run(self):
+        from BatchExport import batch_export
+        try:
+            results = batch_export(self.folder_path, self.output_file_path, progress=self.report, cancelled=lambda: not self.running)
+            for result in results:
+                self.report('advanced', f"{QDateTime.currentDateTime().toString('yyyy-MM-dd hh:mm:ss')} {os.path.basename(result['project'])}: {result['status']} ({result['seconds']:.2f}s){' ' + result['error'] if result['error'] else ''}")
+            self.succeeded = self.running
+        except Exception as e:
+            self.report('basic', f"Error encountered: {e}")
+            self.report('advanced', f"{QDateTime.currentDateTime().toString('yyyy-MM-dd hh:mm:ss')} Error encountered: {e}", 'error')
+            traceback.print_exc()
+        self.finished.emit()
+
+class WatchThread(QThread):
+    changed = pyqtSignal(list)
+
+    def __init__(self, folder_path):
+        super().__init__()
+        self.folder_path = folder_path
+        self.running = True
+
+    def run(self):
+        from ProjectWatcher import watch_project
+        watch_project(self.folder_path, self.changed.emit, lambda: not self.running)
+
+    def stop(self):
+        self.running = False
+
+class LogView(QPlainTextEdit):
+    """Read-only console showing a ConsoleLog, at most max_blocks lines.
+
+    New lines are appended in one batch every flush_interval milliseconds
+    rather than one at a time, so a burst of messages costs a single layout
+    pass and the oldest lines are dropped instead of growing the document.
+    """
+
+    def __init__(self, log, max_blocks=DEFAULT_CAPACITY, flush_interval=100):
+        super().__init__()
+        self.log = log
+        self.setReadOnly(True)
+        self.setUndoRedoEnabled(False)
+        self.setMaximumBlockCount(max_blocks)
+        self.flush_timer = QTimer(self)
+        self.flush_timer.timeout.connect(self.flush)
+        self.flush_timer.start(flush_interval)
+
+    def flush(self):
+        lines = self.log.drain()
+        if lines:
+            self.appendPlainText("\n".join(lines[-self.maximumBlockCount():]))
+
+    def clear_log(self):
+        self.log.clear()
+        self.clear()
+
+class ProjectScanThread(QThread):
+    """Refresh the project index in the background, signalling after each committed batch."""
+    batch_indexed = pyqtSignal()
+
+    def __init__(self):
+        super().__init__()
+        self.running = True
+
+    def run(self):
+        from ProjectIndex import ProjectIndex
+        # SQLite connections belong to one thread, so the scan uses its own
+        index = ProjectIndex()
+        try:
+            index.refresh(self.batch_indexed.emit, lambda: not self.running)
+        except Exception:
+            traceback.print_exc()
+        finally:
+            index.close()
+
+    def stop(self):
+        self.running = False
+
+def icon_key(image_path):
+    """Identify a version of an image by path and mtime, so an edited image gets a new thumbnail."""
+    try:
+        return image_path, os.stat(image_path).st_mtime_ns
+    except OSError:
+        return image_path, None
+
+class ThumbnailSignals(QObject):
+    loaded = pyqtSignal(object, QImage)
+
+class ThumbnailTask(QRunnable):
+    def __init__(self, key, signals):
+        super().__init__()
+        self.key = key
+        self.source_path = key[0]
+        self.signals = signals
+
+    def run(self):
+        image = QImage()
+        try:
+            image = QImage(make_thumbnail(self.source_path))
+        except Exception:
+            # No PIL or an image it cannot read: let Qt decode it at reduced size
+            reader = QImageReader(self.source_path)
+            size = reader.size()
+            if size.isValid():
+                reader.setScaledSize(size.scaled(THUMBNAIL_SIZE, THUMBNAIL_SIZE, Qt.KeepAspectRatio))
+            image = reader.read()
+        self.signals.loaded.emit(self.key, image)
+
+class ThumbnailModel(QAbstractListModel):
+    """List model of (label, image path, item path) whose icons load in the background.
+
+    Thumbnails are only requested when a view asks for an item's icon, which a
+    QListView does for visible items only, so huge lists stay cheap. Icons are
+    kept per image path and mtime; set_items() drops those no longer current.
+    """
+    PathRole = Qt.UserRole
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.items = []
+        self.rows_by_image = {}
+        self.rows_by_item = {}
+        self.icon_keys = {}
+        self.icons = {}
+        self.requested = set()
+        self.pool = QThreadPool(self)
+        self.signals = ThumbnailSignals()
+        self.signals.loaded.connect(self.thumbnail_loaded)
+
+    def set_items(self, items):
+        self.beginResetModel()
+        self.items = list(items)
+        self.rows_by_image = {}
+        self.rows_by_item = {}
+        self.icon_keys = {}
+        for row, (_, image_path, item_path) in enumerate(self.items):
+            self.rows_by_image.setdefault(image_path, []).append(row)
+            self.rows_by_item[item_path] = row
+            if image_path not in self.icon_keys:
+                self.icon_keys[image_path] = icon_key(image_path)
+        current = set(self.icon_keys.values())
+        self.icons = {key: icon for key, icon in self.icons.items() if key in current}
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.items)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        label, image_path, item_path = self.items[index.row()]
+        if role == Qt.DisplayRole:
+            return label
+        if role == Qt.DecorationRole:
+            key = self.icon_keys[image_path]
+            if key not in self.icons and key not in self.requested:
+                self.requested.add(key)
+                self.pool.start(ThumbnailTask(key, self.signals))
+            return self.icons.get(key)
+        if role == Qt.ToolTipRole or role == self.PathRole:
+            return item_path
+        return None
+
+    def thumbnail_loaded(self, key, image):
+        self.requested.discard(key)
+        image_path = key[0]
+        if self.icon_keys.get(image_path) != key:
+            # The image changed or left the list while it was loading
+            return
+        self.icons[key] = QIcon(QPixmap.fromImage(image))
+        for row in self.rows_by_image.get(image_path, []):
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def set_image(self, item_path, image_path):
+        """Show image_path as the icon of the item at item_path."""
+        row = self.rows_by_item.get(item_path)
+        if row is None:
+            return
+        label, old_image_path, _ = self.items[row]
+        self.rows_by_image[old_image_path].remove(row)
+        self.rows_by_image.setdefault(image_path, []).append(row)
+        self.icon_keys.setdefault(image_path, icon_key(image_path))
+        self.items[row] = (label, image_path, item_path)
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+def create_thumbnail_view(model):
+    view = QListView()
+    view.setModel(model)
+    view.setViewMode(QListView.IconMode)
+    view.setIconSize(QSize(THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+    view.setGridSize(QSize(THUMBNAIL_SIZE + 40, THUMBNAIL_SIZE + 50))
+    view.setUniformItemSizes(True)
+    view.setResizeMode(QListView.Adjust)
+    view.setMovement(QListView.Static)
+    view.setWordWrap(True)
+    view.setLayoutMode(QListView.Batched)
+    view.setBatchSize(100)
+    return view
+
+class MapCreatorApp(QWidget):
+    projects_loaded = pyqtSignal()
+
+    def __init__(self):
+        super().__init__()
+        self.initUI()
+        # Nothing touches the disk until the window has been shown
+        QTimer.singleShot(0, self.load_projects)
+
+    def initUI(self):
+        self.setWindowTitle('GoreBox Map Exporter')
+        self.setGeometry(100, 100, 800, 600)  # Increased the height to accommodate the custom textures list
+        self.layout = QVBoxLayout()
+
+        self.tab_widget = QTabWidget()
+        self.tab_widget.setDocumentMode(True)
+        self.tab_widget.tabBar().setShape(QTabBar.RoundedNorth)
+
+        self.import_tab = QWidget()
+        self.import_layout = QVBoxLayout()
+
+        self.import_filter_layout = QHBoxLayout()
+        self.import_search_input = QLineEdit()
+        self.import_search_input.setPlaceholderText('Search projects')
+        self.import_search_input.textChanged.connect(lambda text: self.populate_import_list())
+        self.import_filter_layout.addWidget(self.import_search_input)
+        self.import_sort_combo = QComboBox()
+        for label, sort in (('Name', 'name'), ('Last Modified', 'modified'), ('Textures', 'textures'), ('Map Cubes', 'cubes')):
+            self.import_sort_combo.addItem(label, sort)
+        self.import_sort_combo.currentIndexChanged.connect(lambda index: self.populate_import_list())
+        self.import_filter_layout.addWidget(self.import_sort_combo)
+        self.import_layout.addLayout(self.import_filter_layout)
+
+        self.import_model = ThumbnailModel(self)
+        self.import_view = create_thumbnail_view(self.import_model)
+        self.import_view.clicked.connect(lambda index: self.on_folder_button_clicked(index.data(ThumbnailModel.PathRole)))
+        self.import_layout.addWidget(self.import_view)
+
+        self.refresh_button = QPushButton('Refresh')
+        self.refresh_button.clicked.connect(self.refresh_import_list)
+        self.import_buttons_layout = QHBoxLayout()
+        self.import_buttons_layout.addWidget(self.refresh_button)
+        self.export_all_button = QPushButton('Export All')
+        self.export_all_button.clicked.connect(self.export_all)
+        self.import_buttons_layout.addWidget(self.export_all_button)
+        self.import_buttons_layout.addStretch(1)
+        self.import_layout.addLayout(self.import_buttons_layout)
+
+        self.import_tab.setLayout(self.import_layout)
+        self.tab_widget.addTab(self.import_tab, "Import")
+
+        self.export_tab = QWidget()
+        self.export_layout = QVBoxLayout()
+
+        self.folder_label = QLabel('Folder path')
+        self.export_layout.addWidget(self.folder_label)
+        self.folder_button = QPushButton('Browse')
+        self.folder_button.clicked.connect(self.browse_folder)
+        self.export_layout.addWidget(self.folder_button)
+
+        self.output_label = QLabel('Output file')
+        self.export_layout.addWidget(self.output_label)
+        self.output_button = QPushButton('Browse')
+        self.output_button.clicked.connect(self.browse_output_file)
+        self.export_layout.addWidget(self.output_button)
+        self.compress_checkbox = QCheckBox('Also write a compressed copy (.gbmap.gz) for sharing')
+        self.export_layout.addWidget(self.compress_checkbox)
+        self.watch_checkbox = QCheckBox('Watch the project and re-export on every save')
+        self.watch_checkbox.toggled.connect(self.toggle_watch)
+        self.export_layout.addWidget(self.watch_checkbox)
+
+        self.console_layout = QHBoxLayout()
+
+        self.basic_console_layout = QVBoxLayout()
+        self.basic_console_label = QLabel('Basic Console')
+        self.basic_console_label.setAlignment(Qt.AlignCenter)
+        self.basic_console_layout.addWidget(self.basic_console_label)
+        self.basic_console = LogView(ConsoleLog())
+        self.basic_console_layout.addWidget(self.basic_console)
+        self.console_layout.addLayout(self.basic_console_layout)
+
+        self.advanced_console_layout = QVBoxLayout()
+        self.advanced_console_label = QLabel('Advanced Console')
+        self.advanced_console_label.setAlignment(Qt.AlignCenter)
+        self.advanced_console_layout.addWidget(self.advanced_console_label)
+        # Per-record detail only goes to the log file, which Save Log copies
+        self.advanced_console = LogView(ConsoleLog(file_path=os.path.join(app_cache_dir(), "last_export.log")))
+        self.advanced_console_layout.addWidget(self.advanced_console)
+        self.console_layout.addLayout(self.advanced_console_layout)
+
+        self.export_layout.addLayout(self.console_layout)
+        self.save_log_button = QPushButton('Save Log')
+        self.save_log_button.clicked.connect(self.save_log)
+        self.export_layout.addWidget(self.save_log_button)
+
+        self.progress_layout = QHBoxLayout()
+        self.progress_label = QLabel('Press Start To Export')
+        self.progress_label.setAlignment(Qt.AlignCenter)
+        self.progress_layout.addWidget(self.progress_label)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setValue(0)
+        self.progress_layout.addWidget(self.progress_bar)
+        self.export_layout.addLayout(self.progress_layout)
+
+        self.start_button = QPushButton('Start')
+        self.start_button.clicked.connect(self.start_script)
+        self.export_layout.addWidget(self.start_button)
+
+        self.export_tab.setLayout(self.export_layout)
+        self.tab_widget.addTab(self.export_tab, "Export")
+
+        self.basic_info_tab = QWidget()
+        self.basic_info_layout = QVBoxLayout()
+        self.basic_info_layout.setSpacing(5)
+        self.basic_info_layout.setContentsMargins(5, 5, 5, 5)
+
+        self.map_name_label = QLabel('Map Name')
+        self.basic_info_layout.addWidget(self.map_name_label)
+        self.map_name_input = QLineEdit()
+        self.map_name_input.setPlaceholderText('Leave empty for original name')
+        self.basic_info_layout.addWidget(self.map_name_input)
+
+        self.map_description_label = QLabel('Map Description')
+        self.basic_info_layout.addWidget(self.map_description_label)
+        self.map_description_input = QLineEdit()
+        self.map_description_input.setPlaceholderText('Leave empty for original description')
+        self.basic_info_layout.addWidget(self.map_description_input)
+
+        self.custom_textures_label = QLabel('No Map Project Chosen')
+        self.custom_textures_label.setAlignment(Qt.AlignCenter)
+        self.basic_info_layout.addWidget(self.custom_textures_label)
+
+        self.custom_textures_model = ThumbnailModel(self)
+        self.custom_textures_view = create_thumbnail_view(self.custom_textures_model)
+        self.custom_textures_view.setMinimumHeight(450)  # Increased the minimum height
+        self.custom_textures_view.clicked.connect(lambda index: self.select_texture(index.data(ThumbnailModel.PathRole)))
+        self.basic_info_layout.addWidget(self.custom_textures_view)
+
+        # Add a spacer to create some space between the scroll area and the buttons
+        self.basic_info_layout.addSpacing(10)
+
+        # Add buttons for changing and reverting textures
+        self.button_layout = QHBoxLayout()
+        self.button_layout.setContentsMargins(0, 0, 0, 0)  # Remove any margins
+        self.button_layout.setSpacing(2)  # Set a very small spacing between the buttons
+
+        self.change_texture_button = QPushButton('Change Texture')
+        self.change_texture_button.clicked.connect(self.change_texture)
+        self.button_layout.addWidget(self.change_texture_button)
+
+        self.revert_texture_button = QPushButton('Revert Texture')
+        self.revert_texture_button.clicked.connect(self.revert_texture)
+        self.button_layout.addWidget(self.revert_texture_button)
+
+        self.basic_info_layout.addLayout(self.button_layout)
+
+        # Add label to display the selected texture's name
+        self.selected_texture_label = QLabel('')
+        self.selected_texture_label.setAlignment(Qt.AlignRight | Qt.AlignBottom)
+        self.basic_info_layout.addWidget(self.selected_texture_label)
+
+        self.basic_info_layout.addStretch(1)
+
+        self.basic_info_tab.setLayout(self.basic_info_layout)
+        self.tab_widget.addTab(self.basic_info_tab, "Basic Info")
+
+        self.layout.addWidget(self.tab_widget)
+        self.setLayout(self.layout)
+
+        self.folder_path = None
+        self.output_file_path = default_output_file_path()
+        self.output_label.setText(f'Output file: {self.output_file_path}')
+
+        # Image name -> replacement file, applied by the exporter; the project is never modified
+        self.texture_overrides = {}
+        self.watch_thread = None
+        self.watch_pending = False
+        # Inputs changed since the last watch export; None means validate everything
+        self.watch_changed = None
+        self.selected_texture_path = None
+        self.project_index = None
+        self.scan_thread = None
+
+    def load_projects(self):
+        from ProjectIndex import ProjectIndex
+        # Show the last known projects straight away, then catch up with the disk
+        self.project_index = ProjectIndex()
+        self.populate_import_list()
+        self.refresh_import_list()
+
+    def browse_folder(self):
+        # Revert all images before changing the map project path
+        self.revert_all_textures()
+
+        options = QFileDialog.Options()
+        folder_path = QFileDialog.getExistingDirectory(self, "Select Folder", options=options)
+        if folder_path:
+            self.folder_path = folder_path
+            self.folder_label.setText(f'Folder path: {folder_path}')
+            self.refresh_custom_textures_list()
+            self.restart_watch()
+
+    def browse_output_file(self):
+        options = QFileDialog.Options()
+        default_file_name = "CustomMap.gbmap"
+        default_dir = default_maps_dir()
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save Output File", os.path.join(default_dir, default_file_name), "GBMAP Files (*.gbmap)", options=options)
+        if file_path:
+            self.output_file_path = file_path
+            self.output_label.setText(f'Output file: {file_path}')
+
+    def start_script(self):
+        if not self.folder_path or not self.output_file_path:
+            QMessageBox.warning(self, "Warning", "Please select both the folder and the output file.")
+            return
+
+        map_name = self.map_name_input.text().strip() if self.map_name_input.text().strip() else None
+        map_description = self.map_description_input.text().strip() if self.map_description_input.text().strip() else None
+
+        changed_paths = sorted(self.watch_changed) if self.watch_thread is not None and self.watch_changed is not None else None
+        self.watch_changed = set()
+        self.run_script_thread(ScriptThread(self.folder_path, self.output_file_path, map_name, map_description, self.texture_overrides, 'gzip' if self.compress_checkbox.isChecked() else None, changed_paths))
+
+    def toggle_watch(self, checked):
+        if not checked:
+            self.stop_watch()
+            return
+        if not self.folder_path or not self.output_file_path:
+            QMessageBox.warning(self, "Warning", "Please select both the folder and the output file.")
+            self.watch_checkbox.setChecked(False)
+            return
+        self.watch_thread = WatchThread(self.folder_path)
+        self.watch_thread.changed.connect(self.project_changed)
+        self.watch_thread.start()
+        # Bring the map up to date now, validating everything; later exports only redo what changed
+        self.watch_changed = None
+        self.project_changed([])
+
+    def stop_watch(self):
+        if self.watch_thread is not None:
+            self.watch_thread.stop()
+            self.watch_thread.wait()
+            self.watch_thread = None
+        self.watch_pending = False
+
+    def restart_watch(self):
+        if self.watch_checkbox.isChecked():
+            self.stop_watch()
+            self.toggle_watch(True)
+
+    def project_changed(self, changed):
+        if self.watch_changed is not None:
+            self.watch_changed.update(changed)
+        script_thread = getattr(self, 'script_thread', None)
+        if script_thread is not None and script_thread.isRunning():
+            # Export again once the current one finishes
+            self.watch_pending = True
+            return
+        self.start_script()
+        if changed:
+            self.advanced_console.log.log(f"{QDateTime.currentDateTime().toString('yyyy-MM-dd hh:mm:ss')} Watch: {len(changed)} file(s) changed, e.g. {changed[0]}")
+
+    def export_all(self):
+        if not os.path.exists(default_map_projects_dir()):
+            QMessageBox.warning(self, "Warning", "MapProjects directory does not exist.")
+            return
+        self.tab_widget.setCurrentWidget(self.export_tab)
+        self.run_script_thread(BatchThread(default_map_projects_dir(), default_maps_dir()))
+
+    def run_script_thread(self, script_thread):
+        self.basic_console.clear_log()
+        self.advanced_console.clear_log()
+        self.progress_label.setText('Starting Export')
+        self.progress_bar.setValue(0)
+        self.folder_button.setEnabled(False)
+        self.output_button.setEnabled(False)
+        self.compress_checkbox.setEnabled(False)
+        self.map_name_input.setEnabled(False)
+        self.map_description_input.setEnabled(False)
+        self.start_button.setText('Cancel Export')
+        self.start_button.clicked.disconnect()
+        self.start_button.clicked.connect(self.cancel_script)
+        self.export_all_button.setEnabled(False)
+
+        self.script_thread = script_thread
+        self.script_thread.attach_logs(self.basic_console.log, self.advanced_console.log)
+        self.script_thread.update_progress.connect(self.update_progress)
+        self.script_thread.update_action.connect(self.update_action)
+        self.script_thread.finished.connect(self.script_finished)
+        self.script_thread.start()
+
+    def cancel_script(self):
+        self.script_thread.stop()
+        self.start_button.setEnabled(False)
+        self.start_button.setText('Cancelling...')
+
+    def save_log(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save Log", os.path.join(os.path.expanduser("~"), "export.log"), "Log Files (*.log *.txt)")
+        if file_path:
+            try:
+                self.advanced_console.log.save(file_path)
+            except OSError as e:
+                QMessageBox.warning(self, "Warning", f"Could not save the log: {e}")
+
+    def update_progress(self, value):
+        self.progress_bar.setValue(value)
+
+    def update_action(self, message):
+        self.progress_label.setText(f'{message}')
+
+    def script_finished(self):
+        self.folder_button.setEnabled(True)
+        self.output_button.setEnabled(True)
+        self.compress_checkbox.setEnabled(True)
+        self.start_button.setEnabled(True)
+        self.map_name_input.setEnabled(True)
+        self.map_description_input.setEnabled(True)
+        self.export_all_button.setEnabled(True)
+        self.start_button.setText('Start')
+        self.start_button.clicked.disconnect()
+        self.start_button.clicked.connect(self.start_script)
+        self.progress_label.setText('Press Start To Export')
+        self.progress_bar.setValue(0)
+        if self.watch_thread is not None:
+            if not self.script_thread.succeeded:
+                # Unchanged inputs may be what failed, so check them all again next time
+                self.watch_changed = None
+            if self.watch_pending:
+                self.watch_pending = False
+                self.project_changed([])
+            return
+        if self.script_thread.succeeded:
+            QMessageBox.information(self, "Success", self.script_thread.success_message)
+        elif self.script_thread.running:
+            QMessageBox.warning(self, "Warning", "Map export failed, see the consoles for details.")
+
+    def refresh_import_list(self):
+        if not os.path.exists(default_map_projects_dir()):
+            QMessageBox.warning(self, "Warning", "MapProjects directory does not exist.")
+            self.projects_loaded.emit()
+            return
+        if self.scan_thread is not None and self.scan_thread.isRunning():
+            return
+        self.refresh_button.setEnabled(False)
+        self.scan_thread = ProjectScanThread()
+        self.scan_thread.batch_indexed.connect(self.populate_import_list)
+        self.scan_thread.finished.connect(self.scan_finished)
+        self.scan_thread.start()
+
+    def scan_finished(self):
+        self.refresh_button.setEnabled(True)
+        self.populate_import_list()
+        self.projects_loaded.emit()
+
+    def populate_import_list(self):
+        if self.project_index is None:
+            return
+        sort = self.import_sort_combo.currentData()
+        projects = self.project_index.projects(self.import_search_input.text().strip(), sort, descending=sort != 'name')
+        self.import_model.set_items((project['name'], os.path.join(project['folder'], "icon.png"), project['folder']) for project in projects)
+
+    def on_folder_button_clicked(self, folder_path):
+        if self.is_valid_map_project(folder_path):
+            self.texture_overrides.clear()
+            self.folder_path = folder_path
+            self.folder_label.setText(f'Folder path: {folder_path}')
+            self.tab_widget.setCurrentWidget(self.export_tab)
+            self.refresh_custom_textures_list()
+            self.restart_watch()
+        else:
+            QMessageBox.warning(self, "Warning", "The selected folder is not a valid map project.")
+
+    def refresh_custom_textures_list(self):
+        self.select_texture(None)
+        if not self.folder_path or not self.is_valid_map_project(self.folder_path):
+            self.custom_textures_label.setText('No Map Project Chosen')
+            self.custom_textures_model.set_items([])
+            return
+
+        self.custom_textures_label.setText('Custom Textures')
+        custom_textures_path = os.path.join(self.folder_path, "CustomTextures")
+
+        if not os.path.exists(custom_textures_path):
+            QMessageBox.warning(self, "Warning", "CustomTextures directory does not exist.")
+            return
+
+        textures = [f for f in os.listdir(custom_textures_path) if f.endswith(('.png', '.jpg'))]
+        items = []
+        for texture in textures:
+            texture_path = os.path.join(custom_textures_path, texture)
+            items.append((texture, self.texture_overrides.get(texture_image_name(texture_path), texture_path), texture_path))
+        self.custom_textures_model.set_items(items)
+
+    def select_texture(self, texture_path):
+        self.selected_texture_path = texture_path
+        self.selected_texture_label.setText(os.path.basename(texture_path) if texture_path else '')
+
+    def change_texture(self):
+        if self.selected_texture_path is None:
+            QMessageBox.warning(self, "Warning", "Please select a texture to change.")
+            return
+
+        options = QFileDialog.Options()
+        file_path, _ = QFileDialog.getOpenFileName(self, "Select New Texture", "", "Images (*.png *.jpg)", options=options)
+        if file_path:
+            # Export the new file under the texture's name, leaving the project untouched
+            self.texture_overrides[texture_image_name(self.selected_texture_path)] = file_path
+            self.custom_textures_model.set_image(self.selected_texture_path, file_path)
+
+    def revert_texture(self):
+        if self.selected_texture_path is None:
+            QMessageBox.warning(self, "Warning", "Please select a texture to revert.")
+            return
+
+        if self.texture_overrides.pop(texture_image_name(self.selected_texture_path), None) is not None:
+            self.custom_textures_model.set_image(self.selected_texture_path, self.selected_texture_path)
+
+    def revert_all_textures(self):
+        # Drop every override; the files on disk were never changed
+        self.texture_overrides.clear()
+        self.refresh_custom_textures_list()
+
+    def is_valid_map_project(self, folder_path):
+        return is_valid_map_project(folder_path)
+
+    def closeEvent(self, event):
+        if self.scan_thread is not None:
+            self.scan_thread.stop()
+            self.scan_thread.wait()
+        if self.project_index is not None:
+            self.project_index.close()
+        self.stop_watch()
+        script_thread = getattr(self, 'script_thread', None)
+        if script_thread is not None and script_thread.isRunning():
+            script_thread.stop()
+            script_thread.wait()
+        self.advanced_console.log.close()
+        event.accept()
+
+def main():
+    try:
+        app = QApplication(sys.argv[:1])
+        ex = MapCreatorApp()
+        ex.show()
+        return app.exec_()
+    except Exception as e:
+        print(f"Error: {e}")
+        traceback.print_exc()
+        return 1
+
+if __name__ == '__main__':
+    sys.exit(main())
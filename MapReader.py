@@ -0,0 +1,219 @@
+import os
+import mmap
+
+DELIMITER = "§".encode('utf-8')
+DECODE_CHUNK_SIZE = 1024 * 1024
+LINE_VALUES = {str(num).encode('ascii'): num for num in range(256)}
+
+def decode_lines_to_bytes(data):
+    """Inverse of MapEngine.encode_bytes_to_lines() for a whole number of lines."""
+    try:
+        return bytes(map(LINE_VALUES.__getitem__, data.split()))
+    except KeyError as e:
+        raise RuntimeError(f"Invalid byte line in gbmap: {e}")
+
+def checked_file_name(name):
+    """Return name if it is a plain file name, so writing it stays inside the target folder.
+
+    Names come from the map itself, which may have been crafted, so anything
+    with a path separator or drive colon, or that is empty, . or .., is rejected.
+    """
+    if not name or name in ('.', '..') or any(char in name for char in '/\\:\0') or os.path.basename(name) != name:
+        raise RuntimeError(f"Unsafe file name in gbmap: {name!r}")
+    return name
+
+def map_data_relative_path(cube_path):
+    """Return a cube's path below its MapData folder, so cubes in different shards keep distinct names."""
+    parts = os.path.normpath(cube_path).split(os.sep)
+    if "MapData" in parts:
+        parts = parts[len(parts) - parts[::-1].index("MapData"):]
+    else:
+        parts = parts[-1:]
+    return os.path.join(*map(checked_file_name, parts))
+
+class GbmapReader:
+    """Random access to the sections and records of a .gbmap without loading it.
+
+    Opening the file maps it and builds an index of byte ranges by searching for
+    the section (§) and texture record (~) delimiter lines, which never occur
+    inside decimal data, so indexing costs a few memchr-speed scans rather than
+    a parse. Texture data is decoded back to PNG bytes only when asked for.
+
+    Map cubes are concatenated in the format with nothing between them, so
+    they are only available as one range unless an ExportIndex written by an
+    incremental export of the same file supplies the per-cube boundaries.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.file = open(file_path, 'rb')
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.build_index()
+        except Exception as e:
+            self.close()
+            raise RuntimeError(f"Error reading gbmap file: {e}")
+
+    def close(self):
+        if getattr(self, 'data', None) is not None:
+            self.data.close()
+            self.data = None
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def read_line(self, position):
+        end = self.data.find(b'\n', position)
+        if end == -1:
+            raise ValueError(f"unexpected end of file at byte {position}")
+        line = self.data[position:end]
+        return line.rstrip(b'\r').decode('utf-8'), end + 1
+
+    def find_line(self, line, position):
+        """Return the start of the next line equal to line at or after position."""
+        needle = line + self.newline
+        if self.data[position:position + len(needle)] == needle:
+            return position
+        found = self.data.find(self.newline + needle, position)
+        if found == -1:
+            raise ValueError(f"missing {line.decode('utf-8')!r} delimiter after byte {position}")
+        return found + len(self.newline)
+
+    def build_index(self):
+        first_end = self.data.find(b'\n')
+        if first_end == -1:
+            raise ValueError("not a gbmap file")
+        self.newline = b'\r\n' if self.data[first_end - 1:first_end] == b'\r' else b'\n'
+        self.version, position = self.read_line(0)
+        self.name, position = self.read_line(position)
+        self.description, position = self.read_line(position)
+        delimiter_length = len(DELIMITER + self.newline)
+
+        # Map info: counts then the rest of the project file
+        position = self.find_line(DELIMITER, position) + delimiter_length
+        info_end = self.find_line(DELIMITER, position)
+        info = self.data[position:info_end].decode('utf-8').splitlines()
+        self.cube_count, self.texture_count = int(info[0]), int(info[1])
+        self.project_lines = info[2:]
+        position = info_end + delimiter_length
+
+        self.sections = {}
+        for section in ('icon', 'banner'):
+            end = self.find_line(DELIMITER, position)
+            self.sections[section] = (position, end)
+            position = end + delimiter_length
+
+        self.textures = []
+        textures_start = position
+        for _ in range(self.texture_count):
+            name, data_start = self.read_line(position)
+            data_end = self.find_line(b'~', data_start)
+            self.textures.append((name, data_start, data_end))
+            position = data_end + len(b'~' + self.newline)
+        self.sections['textures'] = (textures_start, position)
+        position = self.find_line(DELIMITER, position) + delimiter_length
+
+        # The cube section runs up to the final delimiter, the last line of the file
+        final = len(self.data) - delimiter_length
+        if self.data[final:] != DELIMITER + self.newline:
+            raise ValueError("missing final delimiter")
+        self.sections['cubes'] = (position, final)
+
+    def decode_range(self, start, end):
+        chunks = []
+        while start < end:
+            stop = min(end, start + DECODE_CHUNK_SIZE)
+            if stop < end:
+                stop = self.data.find(b'\n', stop) + 1 or end
+            chunks.append(decode_lines_to_bytes(self.data[start:stop]))
+            start = stop
+        return b''.join(chunks)
+
+    def read_icon(self):
+        return self.decode_range(*self.sections['icon'])
+
+    def read_banner(self):
+        return self.decode_range(*self.sections['banner'])
+
+    def texture_names(self):
+        return [name for name, _, _ in self.textures]
+
+    def read_texture(self, texture):
+        """Return the PNG bytes of a texture, by index or name."""
+        if isinstance(texture, str):
+            matches = [record for record in self.textures if record[0] == texture]
+            if not matches:
+                raise KeyError(texture)
+            record = matches[0]
+        else:
+            record = self.textures[texture]
+        return self.decode_range(record[1], record[2])
+
+    def read_cubes(self):
+        """Return the raw bytes of the whole map cube section."""
+        start, end = self.sections['cubes']
+        return self.data[start:end]
+
+    def cube_ranges(self, export_index=None):
+        """Return (path relative to MapData, start, end) for each map cube, if the boundaries are known.
+
+        They are only known from an ExportIndex that matches this file; without
+        one the whole section is returned as a single range.
+        """
+        start, end = self.sections['cubes']
+        if export_index is not None:
+            cubes = []
+            for signature, (offset, length) in export_index.records.items():
+                kind, path = signature[:2]
+                if kind == 'cube' and start <= offset and offset + length <= end:
+                    cubes.append((map_data_relative_path(path), offset, offset + length))
+            if len(cubes) == self.cube_count:
+                return sorted(cubes, key=lambda cube: cube[1])
+        return [("MapCubes.mapCube", start, end)]
+
+    def read_cube(self, idx, export_index=None):
+        _, start, end = self.cube_ranges(export_index)[idx]
+        return self.data[start:end]
+
+    def summary(self):
+        lines = [
+            f"{self.file_path}: version {self.version}, {len(self.data)} bytes",
+            f"Name: {self.name}",
+            f"Description: {self.description}",
+            f"Map cubes: {self.cube_count}, custom textures: {self.texture_count}",
+        ]
+        for section, (start, end) in self.sections.items():
+            lines.append(f"  {section:<9} bytes {start}-{end}")
+        for name, start, end in self.textures:
+            lines.append(f"    texture {name}: bytes {start}-{end}")
+        return "\n".join(lines)
+
+    def unpack(self, folder_path, export_index=None):
+        """Recreate a MapProjects folder layout from this map.
+
+        The first line of projectFile.gbi is not stored in a .gbmap and is
+        written empty; all other lines come back stripped, as exported.
+        Every name is checked before anything is written.
+        """
+        texture_file_names = [checked_file_name(name + ".png") for name in self.texture_names()]
+        cube_ranges = self.cube_ranges(export_index)
+        os.makedirs(os.path.join(folder_path, "CustomTextures"), exist_ok=True)
+        os.makedirs(os.path.join(folder_path, "MapData"), exist_ok=True)
+        with open(os.path.join(folder_path, "projectFile.gbi"), 'w', encoding='utf-8') as file:
+            file.write("\n".join(["", self.name, self.description] + self.project_lines) + "\n")
+        with open(os.path.join(folder_path, "icon.png"), 'wb') as file:
+            file.write(self.read_icon())
+        with open(os.path.join(folder_path, "banner.png"), 'wb') as file:
+            file.write(self.read_banner())
+        for idx, file_name in enumerate(texture_file_names):
+            with open(os.path.join(folder_path, "CustomTextures", file_name), 'wb') as file:
+                file.write(self.read_texture(idx))
+        for name, start, end in cube_ranges:
+            cube_file_path = os.path.join(folder_path, "MapData", name)
+            os.makedirs(os.path.dirname(cube_file_path), exist_ok=True)
+            with open(cube_file_path, 'wb') as file:
+                file.write(self.data[start:end])
@@ -0,0 +1,187 @@
+import os
+import json
+import sqlite3
+
+from MapEngine import app_cache_dir, default_map_projects_dir, is_valid_map_project
+
+REFRESH_BATCH_SIZE = 32
+
+SORT_COLUMNS = {
+    'name': 'name COLLATE NOCASE',
+    'modified': 'modified',
+    'textures': 'texture_count',
+    'cubes': 'cube_count',
+    'folder': 'folder COLLATE NOCASE',
+}
+
+def default_index_path():
+    return os.path.join(app_cache_dir(), "projects.sqlite")
+
+def mtime_ns(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+def count_entries(path, extensions):
+    try:
+        with os.scandir(path) as entries:
+            return sum(1 for entry in entries if entry.name.endswith(extensions))
+    except OSError:
+        return 0
+
+def scan_map_data(map_data_path):
+    """Return (cube count, subdirectories) of a MapData folder, nested shards included, in one pass."""
+    count = 0
+    directories = []
+    pending = [map_data_path]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append(entry.path)
+                        pending.append(entry.path)
+                    elif entry.name.endswith(".mapCube"):
+                        count += 1
+        except OSError:
+            continue
+    return count, sorted(directories)
+
+def read_project_header(project_file_path):
+    """Return (name, description) from lines 1 and 2 of a .gbi without reading the rest."""
+    lines = []
+    try:
+        with open(project_file_path, 'r', encoding='utf-8') as file:
+            for line in file:
+                lines.append(line.strip())
+                if len(lines) == 3:
+                    break
+    except (OSError, UnicodeDecodeError):
+        pass
+    lines += [''] * (3 - len(lines))
+    return lines[1], lines[2]
+
+class ProjectIndex:
+    """Persistent SQLite index of the projects under MapProjects.
+
+    refresh() only re-reads a project when the mtime of its folder,
+    projectFile.gbi, CustomTextures, MapData or a MapData shard directory
+    changed since it was indexed;
+    everything the Import tab shows (name, description, validity per
+    is_valid_map_project(), texture and cube counts) comes from the index.
+    """
+
+    def __init__(self, map_projects_dir=None, index_path=None):
+        self.map_projects_dir = map_projects_dir or default_map_projects_dir()
+        index_path = index_path or default_index_path()
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        self.db = sqlite3.connect(index_path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS projects (
+                folder TEXT PRIMARY KEY,
+                root TEXT,
+                name TEXT,
+                description TEXT,
+                valid INTEGER,
+                has_icon INTEGER,
+                has_project_file INTEGER,
+                texture_count INTEGER,
+                cube_count INTEGER,
+                modified INTEGER,
+                stamp TEXT,
+                shard_dirs TEXT
+            )""")
+        if 'shard_dirs' not in [row['name'] for row in self.db.execute("PRAGMA table_info(projects)")]:
+            # Indexes from before sharded MapData; their stamps no longer match, so every project is rescanned
+            self.db.execute("ALTER TABLE projects ADD COLUMN shard_dirs TEXT")
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+    def project_stamp(self, folder_path, shard_dirs):
+        # A cube added inside a shard only changes that shard's mtime
+        paths = [os.path.join(folder_path, name) for name in ("", "projectFile.gbi", "CustomTextures", "MapData")] + shard_dirs
+        return repr(tuple(mtime_ns(path) for path in paths))
+
+    def scan_project(self, folder_path):
+        cube_count, shard_dirs = scan_map_data(os.path.join(folder_path, "MapData"))
+        project_file_path = os.path.join(folder_path, "projectFile.gbi")
+        name, description = read_project_header(project_file_path)
+        mtimes = [mtime for mtime in (mtime_ns(os.path.join(folder_path, entry)) for entry in ("", "projectFile.gbi", "CustomTextures", "MapData", "icon.png", "banner.png")) if mtime is not None]
+        return (
+            folder_path,
+            self.map_projects_dir,
+            name or os.path.basename(folder_path),
+            description,
+            int(is_valid_map_project(folder_path)),
+            int(os.path.exists(os.path.join(folder_path, "icon.png"))),
+            int(os.path.exists(project_file_path)),
+            count_entries(os.path.join(folder_path, "CustomTextures"), ('.png', '.jpg')),
+            cube_count,
+            max(mtimes, default=0),
+            self.project_stamp(folder_path, shard_dirs),
+            json.dumps(shard_dirs),
+        )
+
+    def refresh(self, on_batch=None, cancelled=None, batch_size=REFRESH_BATCH_SIZE):
+        """Bring the index up to date with the MapProjects folder; returns (updated, removed) counts.
+
+        Updated projects are committed batch_size at a time and on_batch() is
+        called after each commit, so a view reading the index from another
+        connection can show projects as they are found. cancelled() is polled
+        between projects; a cancelled refresh keeps what it committed but
+        removes nothing.
+        """
+        known = {row['folder']: (row['stamp'], json.loads(row['shard_dirs'] or '[]')) for row in self.db.execute("SELECT folder, stamp, shard_dirs FROM projects WHERE root = ?", (self.map_projects_dir,))}
+        seen = set()
+        updates = []
+        updated = 0
+
+        def commit():
+            nonlocal updated
+            if updates:
+                with self.db:
+                    self.db.executemany("INSERT OR REPLACE INTO projects VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", updates)
+                updated += len(updates)
+                updates.clear()
+                if on_batch is not None:
+                    on_batch()
+
+        if os.path.isdir(self.map_projects_dir):
+            with os.scandir(self.map_projects_dir) as entries:
+                for entry in entries:
+                    if cancelled is not None and cancelled():
+                        commit()
+                        return updated, 0
+                    if not entry.is_dir():
+                        continue
+                    seen.add(entry.path)
+                    stamp, shard_dirs = known.get(entry.path, (None, []))
+                    if stamp != self.project_stamp(entry.path, shard_dirs):
+                        updates.append(self.scan_project(entry.path))
+                        if len(updates) >= batch_size:
+                            commit()
+        commit()
+        removed = [folder for folder in known if folder not in seen]
+        if removed:
+            with self.db:
+                self.db.executemany("DELETE FROM projects WHERE folder = ?", [(folder,) for folder in removed])
+            if on_batch is not None:
+                on_batch()
+        return updated, len(removed)
+
+    def projects(self, search=None, sort='name', descending=False, importable_only=True):
+        """Return indexed projects as dicts, optionally filtered by a name/description/folder substring."""
+        query = "SELECT * FROM projects WHERE root = ?"
+        params = [self.map_projects_dir]
+        if importable_only:
+            query += " AND has_icon AND has_project_file"
+        if search:
+            pattern = f"%{search}%"
+            query += " AND (name LIKE ? OR description LIKE ? OR folder LIKE ?)"
+            params += [pattern, pattern, pattern]
+        query += f" ORDER BY {SORT_COLUMNS[sort]} {'DESC' if descending else 'ASC'}"
+        return [dict(row) for row in self.db.execute(query, params)]
@@ -0,0 +1,180 @@
+import os
+import codecs
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+from MapEngine import apply_texture_overrides, default_jobs, unmatched_texture_overrides, estimate_gbmap_size, list_custom_textures, scan_map_cubes, project_paths
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+JPG_SIGNATURE = b'\xff\xd8\xff'
+CHECK_CHUNK_SIZE = 1024 * 1024
+# Bytes a quick map cube check decodes from the start of the file
+CHECK_HEAD_SIZE = 64 * 1024
+# Rough single-worker rates for the export time estimate, in input bytes per second
+ESTIMATED_ENCODE_RATE = 10 * 1024 * 1024
+ESTIMATED_COPY_RATE = 200 * 1024 * 1024
+
+def check_image(file_path, png_only=False):
+    """Return (errors, warnings) for an image, from its signature and header alone.
+
+    PNG dimensions come from the IHDR chunk and a missing IEND chunk marks a
+    truncated file; JPGs are opened lazily with PIL, which parses the header
+    without decoding any pixels.
+    """
+    errors, warnings = [], []
+    try:
+        size = os.path.getsize(file_path)
+        with open(file_path, 'rb') as file:
+            header = file.read(24)
+            file.seek(max(0, size - 12))
+            trailer = file.read(12)
+    except OSError as e:
+        return [f"{file_path}: cannot be read ({e})"], []
+
+    if header.startswith(PNG_SIGNATURE):
+        if header[12:16] != b'IHDR':
+            errors.append(f"{file_path}: PNG has no IHDR header")
+        else:
+            width, height = struct.unpack('>II', header[16:24])
+            if width == 0 or height == 0:
+                errors.append(f"{file_path}: PNG is {width}x{height}")
+        if trailer[4:8] != b'IEND':
+            errors.append(f"{file_path}: PNG is truncated (no IEND chunk)")
+        if file_path.endswith(".jpg"):
+            warnings.append(f"{file_path}: is a PNG despite its .jpg extension and will be converted anyway")
+    elif header.startswith(JPG_SIGNATURE):
+        if png_only or not file_path.endswith(".jpg"):
+            warnings.append(f"{file_path}: is a JPG, but it is exported as-is where PNG data is expected")
+        else:
+            try:
+                from PIL import Image
+            except ImportError:
+                return [f"{file_path}: JPG textures need PIL (pip install Pillow)"], warnings
+            try:
+                with Image.open(file_path) as img:
+                    width, height = img.size
+                if width == 0 or height == 0:
+                    errors.append(f"{file_path}: JPG is {width}x{height}")
+            except Exception as e:
+                errors.append(f"{file_path}: JPG cannot be opened ({e})")
+    else:
+        errors.append(f"{file_path}: is neither a PNG nor a JPG")
+    return errors, warnings
+
+def check_project_file(file_path):
+    """Return (errors, warnings) for projectFile.gbi: valid UTF-8 with enough header lines."""
+    # Line 1 is skipped and lines 2 and 3 are always consumed, even when overridden
+    required = 3
+    try:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            lines = sum(1 for _ in file)
+    except UnicodeDecodeError as e:
+        return [f"{file_path}: is not valid UTF-8 ({e})"], []
+    except OSError as e:
+        return [f"{file_path}: cannot be read ({e})"], []
+    if lines < required:
+        return [f"{file_path}: has {lines} line(s), at least {required} are needed"], []
+    return [], []
+
+def check_map_cube(file_path, full=False):
+    """Return (errors, warnings) for a map cube: non-empty, UTF-8 and newline terminated.
+
+    Only the first CHECK_HEAD_SIZE bytes are decoded unless full is True.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        with open(file_path, 'rb') as file:
+            if full:
+                for chunk in iter(lambda: file.read(CHECK_CHUNK_SIZE), b''):
+                    decoder.decode(chunk)
+                decoder.decode(b'', final=True)
+            else:
+                head = file.read(CHECK_HEAD_SIZE)
+                # A file shorter than the head has been read whole, so a cut-off character is an error
+                decoder.decode(head, final=len(head) < CHECK_HEAD_SIZE)
+            size = file.seek(0, os.SEEK_END)
+            if size:
+                file.seek(size - 1)
+                last = file.read(1)
+    except UnicodeDecodeError as e:
+        return [f"{file_path}: is not valid UTF-8 ({e})"], []
+    except OSError as e:
+        return [f"{file_path}: cannot be read ({e})"], []
+    if not size:
+        return [], [f"{file_path}: is empty"]
+    if last not in (b'\n', b'\r'):
+        return [], [f"{file_path}: does not end with a newline and runs into the next cube"]
+    return [], []
+
+def estimate_export_seconds(icon_file_path, banner_file_path, custom_textures, cube_bytes, jobs=1):
+    """Very roughly estimate an uncached export's duration from input sizes."""
+    texture_bytes = sum(os.path.getsize(path) for path in [icon_file_path, banner_file_path] + [path for _, path in custom_textures])
+    return texture_bytes / (ESTIMATED_ENCODE_RATE * max(1, jobs)) + cube_bytes / ESTIMATED_COPY_RATE
+
+def validate_project(folder_path, jobs=None, texture_overrides=None, changed_paths=None, export_index=None, full=False):
+    """Check every input of a project without exporting it.
+
+    Checks run on a thread pool and all problems are collected rather than
+    stopping at the first. Returns a dict with 'errors' and 'warnings' (lists
+    of messages), 'textures', 'cubes' and 'checked' (files) counts, and 'estimated_size' (bytes)
+    and 'estimated_seconds' for the export, the latter two None if the
+    project folders themselves are missing.
+
+    With changed_paths (e.g. from watch mode, whose previous export passed
+    validation), images and cubes are only checked if they are in it or are
+    texture overrides; the project file is always checked. With export_index,
+    the ExportIndex of the last successful export, inputs it recorded with the
+    same size and mtime are skipped. full decodes all of every map cube.
+    """
+    jobs = jobs or default_jobs()
+    paths = project_paths(folder_path)
+    missing = [path for path in paths.values() if not os.path.exists(path)]
+    result = {'errors': [f"{path}: is missing" for path in missing], 'warnings': [], 'textures': 0, 'cubes': 0, 'checked': 0, 'estimated_size': None, 'estimated_seconds': None}
+    if missing:
+        return result
+
+    custom_textures = list_custom_textures(paths['custom_textures'])
+    result['errors'] += [f"texture override {name!r}: no custom texture has that name" for name in unmatched_texture_overrides(custom_textures, texture_overrides)]
+    custom_textures = apply_texture_overrides(custom_textures, texture_overrides)
+    map_cubes, cube_bytes = scan_map_cubes(paths['map_data'])
+    result['textures'], result['cubes'] = len(custom_textures), len(map_cubes)
+
+    seen_names = set()
+    for image_name, file_path in custom_textures:
+        if image_name in seen_names:
+            result['warnings'].append(f"{file_path}: another texture is also named {image_name!r} and both are exported")
+        seen_names.add(image_name)
+
+    recheck = None
+    if changed_paths is not None:
+        recheck = {os.path.abspath(path) for path in list(changed_paths) + list((texture_overrides or {}).values())}
+
+    exported = None
+    if export_index is not None:
+        from ExportIndex import input_signature
+        root = os.path.join(folder_path, "")
+        exported = {signature[1:4] for signature in export_index.records}
+
+    def wanted(file_path):
+        if recheck is not None:
+            return os.path.abspath(file_path) in recheck
+        if exported is not None:
+            try:
+                return input_signature(None, file_path, root=root)[1:4] not in exported
+            except OSError:
+                return True
+        return True
+
+    checks = [(check_project_file, paths['project_file'])]
+    checks += [(check_image, file_path, True) for file_path in (paths['icon'], paths['banner']) if wanted(file_path)]
+    checks += [(check_image, file_path) for _, file_path in custom_textures if wanted(file_path)]
+    checks += [(check_map_cube, file_path, full) for file_path in map_cubes if wanted(file_path)]
+    result['checked'] = len(checks)
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        for errors, warnings in pool.map(lambda check: check[0](*check[1:]), checks):
+            result['errors'] += errors
+            result['warnings'] += warnings
+
+    result['estimated_size'] = estimate_gbmap_size(paths['icon'], paths['banner'], custom_textures, map_cubes, cube_bytes)
+    result['estimated_seconds'] = estimate_export_seconds(paths['icon'], paths['banner'], custom_textures, cube_bytes, jobs)
+    return result
@@ -0,0 +1,124 @@
+import os
+import time
+import threading
+
+from MapEngine import project_paths
+
+POLL_INTERVAL = 0.25
+DEBOUNCE_SECONDS = 0.3
+# Polling waits at least this many times as long as a snapshot took, so it
+# never keeps more than a small fraction of a core busy on huge projects
+POLL_COST_RATIO = 10
+
+def snapshot_directory(directory_path, extensions, recursive, snapshot):
+    pending = [directory_path]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if recursive and entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.name.endswith(extensions):
+                        stat = entry.stat()
+                        snapshot[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            # A folder mid-rename or briefly missing; the next poll catches up
+            continue
+
+def snapshot_project(folder_path):
+    """Return {path: (size, mtime_ns)} for every file an export of folder_path reads.
+
+    Folders are walked with os.scandir, unsorted, and sizes and mtimes come
+    from the scan's own entries.
+    """
+    paths = project_paths(folder_path)
+    snapshot = {}
+    for file_path in (paths['project_file'], paths['icon'], paths['banner']):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            continue
+        snapshot[file_path] = (stat.st_size, stat.st_mtime_ns)
+    snapshot_directory(paths['custom_textures'], ('.png', '.jpg'), False, snapshot)
+    snapshot_directory(paths['map_data'], '.mapCube', True, snapshot)
+    return snapshot
+
+def timed_snapshot(folder_path):
+    start = time.perf_counter()
+    snapshot = snapshot_project(folder_path)
+    return snapshot, time.perf_counter() - start
+
+def changed_paths(before, after):
+    return sorted(path for path in before.keys() | after.keys() if before.get(path) != after.get(path))
+
+def start_native_watcher(folder_path):
+    """Return (event, stop) for an OS-level watcher of a project, or None if watchdog is unavailable.
+
+    The event is set whenever anything an export reads may have changed; what
+    changed is still worked out from snapshots, so the watcher only has to wake
+    the loop up early.
+    """
+    try:
+        from watchdog.observers import Observer
+        from watchdog.events import FileSystemEventHandler
+    except ImportError:
+        return None
+    event = threading.Event()
+    watched = tuple(os.path.abspath(path) for path in project_paths(folder_path).values())
+
+    class Handler(FileSystemEventHandler):
+        def on_any_event(self, fs_event):
+            paths = [fs_event.src_path, getattr(fs_event, 'dest_path', '') or '']
+            if any(os.path.abspath(path).startswith(watched) for path in paths if path):
+                event.set()
+
+    observer = Observer()
+    observer.schedule(Handler(), folder_path, recursive=True)
+    observer.start()
+
+    def stop():
+        observer.stop()
+        observer.join()
+
+    return event, stop
+
+def watch_project(folder_path, on_change, stop=None, poll_interval=POLL_INTERVAL, debounce=DEBOUNCE_SECONDS):
+    """Call on_change(changed_paths) after every burst of changes to a project, until stop() returns True.
+
+    Watches MapData, CustomTextures, projectFile.gbi, icon.png and banner.png
+    with watchdog (inotify, FSEvents, ReadDirectoryChangesW) when installed and
+    by polling file sizes and mtimes otherwise, every poll_interval seconds
+    or POLL_COST_RATIO times the last snapshot's duration, whichever is
+    longer. A burst of saves is debounced: on_change runs once nothing has
+    changed for debounce seconds.
+    """
+    stop = stop or (lambda: False)
+    previous, snapshot_seconds = timed_snapshot(folder_path)
+    native = start_native_watcher(folder_path)
+    try:
+        while not stop():
+            if native is not None:
+                if not native[0].wait(poll_interval):
+                    continue
+                native[0].clear()
+            else:
+                time.sleep(max(poll_interval, snapshot_seconds * POLL_COST_RATIO))
+            current, snapshot_seconds = timed_snapshot(folder_path)
+            if current == previous:
+                continue
+            # Wait for the burst to settle so a multi-file save triggers one export
+            while not stop():
+                time.sleep(max(debounce, snapshot_seconds))
+                latest, snapshot_seconds = timed_snapshot(folder_path)
+                if latest == current:
+                    break
+                current = latest
+            if native is not None:
+                native[0].clear()
+            changed = changed_paths(previous, current)
+            previous = current
+            if changed and not stop():
+                on_change(changed)
+    finally:
+        if native is not None:
+            native[1]()
@@ -0,0 +1,132 @@
+import os
+import json
+import shutil
+import threading
+from contextlib import contextmanager
+
+from MapEngine import app_cache_dir, file_digest
+
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+COPY_BUFFER_SIZE = 1024 * 1024
+
+def default_cache_dir():
+    return os.path.join(app_cache_dir(), "textures")
+
+class TextureCache:
+    """Content-addressed store of already-encoded .gbmap texture blocks.
+
+    Blocks are keyed by the SHA-256 of the source file plus a variant string
+    (source type and line ending). A small index maps path/size/mtime to the
+    digest so an unchanged file is recognised with a single stat. Total block
+    size is capped at max_bytes, evicting least recently used blocks on close().
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(self.cache_dir, "index.json")
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as file:
+                self.index = json.load(file)
+        except (OSError, ValueError):
+            self.index = {}
+        self.dirty = False
+
+    def key(self, file_path, variant):
+        """Return the cache key of file_path, hashing it only if it changed since last seen."""
+        stat = os.stat(file_path)
+        path = os.path.abspath(file_path)
+        with self.lock:
+            entry = self.index.get(path)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            digest = entry[2]
+        else:
+            digest = file_digest(file_path)
+            with self.lock:
+                self.index[path] = [stat.st_size, stat.st_mtime_ns, digest]
+                self.dirty = True
+        return f"{digest}.{variant}"
+
+    def block_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def has_block(self, key):
+        return os.path.exists(self.block_path(key))
+
+    def copy_block(self, key, output):
+        """Copy a cached block into output, returning False on a miss."""
+        block_path = self.block_path(key)
+        try:
+            with open(block_path, 'rb') as block:
+                shutil.copyfileobj(block, output, COPY_BUFFER_SIZE)
+        except FileNotFoundError:
+            return False
+        try:
+            # Block mtime doubles as the LRU timestamp
+            os.utime(block_path)
+        except OSError:
+            pass
+        with self.lock:
+            self.hits += 1
+        return True
+
+    @contextmanager
+    def store_block(self, key):
+        """Yield a binary file for a new block; it is published only if the body succeeds."""
+        block_path = self.block_path(key)
+        os.makedirs(os.path.dirname(block_path), exist_ok=True)
+        temp_path = f"{block_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'wb') as block:
+                yield block
+            os.replace(temp_path, block_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        with self.lock:
+            self.misses += 1
+
+    def evict(self):
+        blocks = []
+        total = 0
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith('.tmp'):
+                    continue
+                stat = entry.stat()
+                blocks.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        blocks.sort()
+        for _, size, path in blocks:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def close(self):
+        self.evict()
+        with self.lock:
+            if not self.dirty:
+                return
+            for path in [path for path in self.index if not os.path.exists(path)]:
+                del self.index[path]
+            temp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(self.index, file)
+            os.replace(temp_path, self.index_path)
+            self.dirty = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,43 @@
+import io
+
+def reduce_palette(img):
+    """Return an RGB image as an exactly equivalent palette image, or None if it has over 256 colours."""
+    from PIL import Image
+    colors = img.getcolors(256)
+    if colors is None:
+        return None
+    palette = Image.new('P', (1, 1))
+    palette.putpalette([channel for _, rgb in colors for channel in rgb])
+    reduced = img.quantize(palette=palette, dither=getattr(Image, 'Dither', Image).NONE)
+    # Every pixel has an exact palette entry, but verify rather than trust the quantizer
+    if reduced.convert('RGB').tobytes() != img.tobytes():
+        return None
+    return reduced
+
+def optimize_png(data, max_dimension=None):
+    """Recompress PNG bytes losslessly, optionally downsizing first.
+
+    Uses maximum zlib compression with optimize=True and exact palette
+    reduction for RGB images with at most 256 colours, keeping any ICC profile
+    and transparency. Without a resize the original bytes are returned if the
+    result is not smaller. Only downsizing above max_dimension loses detail.
+    """
+    from PIL import Image
+    with Image.open(io.BytesIO(data)) as img:
+        img.load()
+        resized = bool(max_dimension) and max(img.size) > max_dimension
+        if resized:
+            img.thumbnail((max_dimension, max_dimension), getattr(Image, 'Resampling', Image).LANCZOS)
+        options = {'optimize': True}
+        if img.info.get('icc_profile'):
+            options['icc_profile'] = img.info['icc_profile']
+        if 'transparency' in img.info:
+            options['transparency'] = img.info['transparency']
+        if img.mode == 'RGB' and 'transparency' not in options:
+            img = reduce_palette(img) or img
+        output = io.BytesIO()
+        img.save(output, 'PNG', **options)
+    optimized = output.getvalue()
+    if not resized and len(optimized) >= len(data):
+        return data
+    return optimized
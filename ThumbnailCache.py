@@ -0,0 +1,40 @@
+import os
+import hashlib
+import threading
+
+from MapEngine import app_cache_dir
+
+THUMBNAIL_SIZE = 80
+
+def default_thumbnail_dir():
+    return os.path.join(app_cache_dir(), "thumbnails")
+
+def thumbnail_path(source_path, size=THUMBNAIL_SIZE, cache_dir=None):
+    """Return where the thumbnail of source_path is cached; it changes whenever the source does."""
+    stat = os.stat(source_path)
+    key = f"{os.path.abspath(source_path)}\0{stat.st_size}\0{stat.st_mtime_ns}\0{size}"
+    name = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir or default_thumbnail_dir(), name[:2], name + ".png")
+
+def make_thumbnail(source_path, size=THUMBNAIL_SIZE, cache_dir=None):
+    """Return the path of a size x size (at most) PNG thumbnail of an image, creating it if needed.
+
+    JPGs are decoded at reduced scale with Image.draft(), so a 4K texture never
+    gets decoded at full resolution just to fill an 80x80 button.
+    """
+    path = thumbnail_path(source_path, size, cache_dir)
+    if os.path.exists(path):
+        return path
+    from PIL import Image
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with Image.open(source_path) as img:
+            img.draft('RGB', (size, size))
+            img.thumbnail((size, size))
+            img.save(temp_path, 'PNG')
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return path